@@ -1,5 +1,6 @@
-from PyQt6.QtWidgets import QApplication, QMainWindow
-from PyQt6.QtGui import QPainter, QPen, QColor, QAction, QBrush
+from common.qt import event_pos
+from common.qt.QtWidgets import QApplication, QMainWindow
+from common.qt.QtGui import QPainter, QPen, QColor, QAction, QBrush
 from shapes import Shape
 
 
@@ -29,7 +30,7 @@ class PainterWindow(QMainWindow):
 
     def mousePressEvent(self, event):
         if self.current_shape:
-            new_shape = Shape(self.current_shape, event.position())
+            new_shape = Shape(self.current_shape, event_pos(event))
             self.shapes.append(new_shape)
             self.update()  
 
@@ -1,10 +1,25 @@
+import os
 import sys
-from PyQt6.QtWidgets import QApplication
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# привязка, под которую написана лабораторная (как в launcher.LABS);
+# QT_API из окружения имеет приоритет
+os.environ.setdefault('QT_API', 'PyQt6')
+
+from common.qt.QtWidgets import QApplication
 from painter_window import PainterWindow
 
 
-if __name__ == "__main__":
+def create_window():
+    return PainterWindow()
+
+
+def main():
     app = QApplication(sys.argv)
-    window = PainterWindow()
+    window = create_window()
     window.show()
     sys.exit(app.exec())
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,44 @@
-from PyQt6.QtCore import QPointF
-from PyQt6.QtGui import QAction, QPainter, QPen, QColor
-from PyQt6.QtWidgets import QMainWindow, QInputDialog
+from common.qt.QtCore import QPointF
+from common.qt.QtGui import QAction, QPainter, QPen, QColor
+from common.qt.QtWidgets import QMainWindow, QInputDialog
 
 from polygon_shape import PolygonShape
 
+WINDOW_STYLE = """
+    QMainWindow {
+        background-color: white;
+    }
+    QMenuBar {
+        background-color: #f0f0f0;
+        color: black;
+        border-bottom: 1px solid #cccccc;
+    }
+    QMenuBar::item {
+        padding: 5px 10px;
+        background: transparent;
+    }
+    QMenuBar::item:selected {
+        background-color: #d0d0d0;
+    }
+    QMenuBar::item:pressed {
+        background-color: #c0c0c0;
+    }
+"""
+
+# Стиль выпадающих меню применяется при первом открытии, а не при запуске
+MENU_STYLE = """
+    QMenu {
+        background-color: white;
+        color: black;
+        border: 1px solid #cccccc;
+    }
+    QMenu::item {
+        padding: 5px 20px;
+    }
+    QMenu::item:selected {
+        background-color: #e0e0e0;
+    }
+"""
 
 class PainterWindow(QMainWindow):
     def __init__(self):
@@ -11,37 +46,7 @@ class PainterWindow(QMainWindow):
         self.setWindowTitle("Painter – Полигоны")
         self.setGeometry(100, 100, 800, 600)
 
-        self.setStyleSheet("""
-                    QMainWindow {
-                        background-color: white;
-                    }
-                    QMenuBar {
-                        background-color: #f0f0f0;
-                        color: black;
-                        border-bottom: 1px solid #cccccc;
-                    }
-                    QMenuBar::item {
-                        padding: 5px 10px;
-                        background: transparent;
-                    }
-                    QMenuBar::item:selected {
-                        background-color: #d0d0d0;
-                    }
-                    QMenuBar::item:pressed {
-                        background-color: #c0c0c0;
-                    }
-                    QMenu {
-                        background-color: white;
-                        color: black;
-                        border: 1px solid #cccccc;
-                    }
-                    QMenu::item {
-                        padding: 5px 20px;
-                    }
-                    QMenu::item:selected {
-                        background-color: #e0e0e0;
-                    }
-                """)
+        self.setStyleSheet(WINDOW_STYLE)
 
         self.shapes = []
         self.current_shape_type = None
@@ -53,11 +58,13 @@ class PainterWindow(QMainWindow):
         menubar = self.menuBar()
 
         shapes_menu = menubar.addMenu("Фигуры")
+        self.style_on_first_show(shapes_menu)
         polygon_action = QAction("Полигон", self)
         polygon_action.triggered.connect(self.add_polygon)
         shapes_menu.addAction(polygon_action)
 
         transform_menu = menubar.addMenu("Трансформации")
+        self.style_on_first_show(transform_menu)
 
         move_action = QAction("Перенести", self)
         move_action.triggered.connect(self.move_shape)
@@ -67,6 +74,12 @@ class PainterWindow(QMainWindow):
         rotate_action.triggered.connect(self.rotate_shape)
         transform_menu.addAction(rotate_action)
 
+    def style_on_first_show(self, menu):
+        def apply():
+            menu.aboutToShow.disconnect(apply)
+            menu.setStyleSheet(MENU_STYLE)
+        menu.aboutToShow.connect(apply)
+
     def add_polygon(self):
         """Добавляем полигон в список фигур"""
         # Рисуем "песочные часы" из картинки
@@ -116,7 +129,7 @@ class PainterWindow(QMainWindow):
 
     def paintEvent(self, event):
         painter = QPainter(self)
-        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        painter.setRenderHint(QPainter.Antialiasing)
         pen = QPen(QColor(0, 0, 0), 2)
         painter.setPen(pen)
 
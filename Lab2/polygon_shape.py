@@ -1,5 +1,6 @@
-from PyQt6.QtCore import QPointF
-from PyQt6.QtGui import QPainter, QTransform
+from common.geometry import rotate_translate
+from common.qt.QtCore import QPointF
+from common.qt.QtGui import QPainter, QPolygonF
 from shape import Shape
 
 
@@ -9,22 +10,12 @@ class PolygonShape(Shape):
         self.points = points  # Список QPointF
 
     def draw(self, painter: QPainter):
-        painter.drawPolygon(*self.points)
+        painter.drawPolygon(QPolygonF(self.points))
 
     def transform(self, dx=0, dy=0, angle=0):
         if not self.points:
             return
 
-        # Выбираем первую точку как центр вращения
-        pivot = self.points[0]
-
-        transform = QTransform()
-        transform.translate(pivot.x(), pivot.y())
-        transform.rotate(angle)
-        transform.translate(-pivot.x(), -pivot.y())
-
-        # Поворачиваем точки
-        self.points = [transform.map(p) for p in self.points]
-
-        # Сдвигаем полигоны
-        self.points = [QPointF(p.x() + dx, p.y() + dy) for p in self.points]
+        # Выбираем первую точку как центр вращения, затем сдвигаем
+        pts = [(p.x(), p.y()) for p in self.points]
+        self.points = [QPointF(x, y) for x, y in rotate_translate(pts, pts[0], angle, dx, dy)]
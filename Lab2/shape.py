@@ -1,4 +1,4 @@
-from PyQt6.QtGui import QPainter
+from common.qt.QtGui import QPainter
 
 
 class Shape:
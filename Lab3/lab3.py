@@ -1,9 +1,36 @@
-from PyQt5.QtWidgets import (QApplication, QWidget, QPushButton, QVBoxLayout,
-                             QHBoxLayout, QLabel, QCheckBox)
-from PyQt5.QtGui import QPainter, QPen, QColor, QPainterPath
-from PyQt5.QtCore import Qt, QPointF
+import os
 import sys
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# привязка, под которую написана лабораторная (как в launcher.LABS);
+# QT_API из окружения имеет приоритет
+os.environ.setdefault('QT_API', 'PyQt5')
+
+from common.qt import event_pos
+from common.qt.QtWidgets import (QApplication, QWidget, QPushButton, QVBoxLayout,
+                                 QHBoxLayout, QLabel, QCheckBox, QComboBox)
+from common.qt.QtGui import QPainter, QPen, QColor
+from common.qt.QtCore import Qt, QPointF
+from common.spline import build_composite_bezier, hit_point
+from common.tile_renderer import (make_backends, draw_frame_times, intersects,
+                                   path_bounds, points_bounds)
+
+
+class SplineScene:
+    """Снимок состояния SplinePainter для отрисовки вне GUI-потока"""
+
+    def __init__(self, widget):
+        self.points = list(widget.points)
+        self.path = widget.path
+        self.path_bounds = path_bounds(widget.path, 2) if widget.path is not None else None
+        self.control_pairs = []
+        if widget.show_control and widget._last_control_pairs:
+            self.control_pairs = list(widget._last_control_pairs)
+        # границы групп объектов, чтобы плитки пропускали то, что их не касается
+        self.points_bounds = points_bounds(self.points, 5)
+        self.controls_bounds = points_bounds(
+            self.points + [c for pair in self.control_pairs for c in pair], 4)
+
 
 class SplinePainter(QWidget):
     def __init__(self):
@@ -22,12 +49,18 @@ class SplinePainter(QWidget):
         self.chk_control = QCheckBox('Показать вспомогательные точки')
         self.chk_control.setChecked(True)
         self.chk_control.stateChanged.connect(self.toggle_control)
+        self.backends = make_backends()
+        self.backend = self.backends[0]
+        self.backend_combo = QComboBox()
+        self.backend_combo.addItems([b.name for b in self.backends])
+        self.backend_combo.currentIndexChanged.connect(self.set_backend)
         instr = QLabel('Левый клик: добавить | Перетащить: переместить | Правый клик по точке: удалить')
 
         hbox = QHBoxLayout()
         hbox.addWidget(btn_clear)
         hbox.addWidget(btn_build)
         hbox.addWidget(self.chk_control)
+        hbox.addWidget(self.backend_combo)
         hbox.addStretch()
 
         layout = QVBoxLayout(self)
@@ -35,120 +68,93 @@ class SplinePainter(QWidget):
         layout.addWidget(instr)
 
         self.path = None 
+        self._last_control_pairs = None
 
     def toggle_control(self, state):
-        self.show_control = state == Qt.Checked
+        self.show_control = self.chk_control.isChecked()
+        self.update()
+
+    def set_backend(self, index):
+        self.backend = self.backends[index]
         self.update()
 
     def clear_points(self):
         self.points = []
         self.path = None
+        self._last_control_pairs = None
         self.update()
 
     def rebuild_and_update(self):
-        self.path = self.build_composite_bezier(self.points)
+        self.path, self._last_control_pairs = build_composite_bezier(self.points)
         self.update()
 
     def mousePressEvent(self, event):
-        p = event.pos()
+        p = event_pos(event)
         if event.button() == Qt.LeftButton:
-            idx = self.find_nearest_point_index(p)
-            if idx is not None and (self.points[idx] - p).manhattanLength() < 12:
+            idx = hit_point(self.points, p, 12)
+            if idx is not None:
                 self.drag_index = idx
             else:
-                self.points.append(QPointF(p))
+                self.points.append(p)
                 self.rebuild_and_update()
         elif event.button() == Qt.RightButton:
-            idx = self.find_nearest_point_index(p)
-            if idx is not None and (self.points[idx] - p).manhattanLength() < 12:
+            idx = hit_point(self.points, p, 12)
+            if idx is not None:
                 del self.points[idx]
                 self.rebuild_and_update()
 
     def mouseMoveEvent(self, event):
         if self.drag_index != -1:
-            self.points[self.drag_index] = QPointF(event.pos())
+            self.points[self.drag_index] = event_pos(event)
             self.rebuild_and_update()
 
     def mouseReleaseEvent(self, event):
         self.drag_index = -1
 
-    def find_nearest_point_index(self, pos):
-        best_i = None
-        best_d = None
-        for i, pt in enumerate(self.points):
-            d = (pt - pos).manhattanLength()
-            if best_d is None or d < best_d:
-                best_d = d
-                best_i = i
-        return best_i
-
-    def build_composite_bezier(self, base_points):
-        n = len(base_points)
-        if n < 2:
-            return None
-        P = base_points
-
-        T = [QPointF(0, 0) for _ in range(n)]
-        if n == 2:
-            T[0] = P[1] - P[0]
-            T[1] = P[1] - P[0]
-        else:
-            for i in range(1, n-1):
-                T[i] = (P[i+1] - P[i-1]) * 0.5
-            T[0] = P[1] - P[0]
-            T[n-1] = P[n-1] - P[n-2]
-
-        control_pairs = [] 
-        for i in range(n-1):
-            C1 = P[i] + T[i] * (1.0/3.0)
-            C2 = P[i+1] - T[i+1] * (1.0/3.0)
-            control_pairs.append((C1, C2))
-
-        path = QPainterPath(P[0])
-        for i in range(n-1):
-            C1, C2 = control_pairs[i]
-            path.cubicTo(C1, C2, P[i+1])
-        self._last_control_pairs = control_pairs
-        return path
-
     def paintEvent(self, event):
         painter = QPainter(self)
+        self.backend.render(painter, self.size(), self.draw_scene, SplineScene(self),
+                            self.devicePixelRatioF())
+        draw_frame_times(painter, self.backends, self.backend)
+
+    @staticmethod
+    def draw_scene(painter, scene, rect):
         painter.setRenderHint(QPainter.Antialiasing)
 
-        painter.fillRect(self.rect(), QColor(255, 255, 255))
+        painter.fillRect(rect, QColor(255, 255, 255))
 
         pen = QPen(Qt.black, 1)
         painter.setPen(pen)
-        for pt in self.points:
-            painter.drawEllipse(pt, 4, 4)
+        if intersects(rect, scene.points_bounds):
+            for pt in scene.points:
+                painter.drawEllipse(pt, 4, 4)
 
-        if len(self.points) >= 2:
-            pen = QPen(QColor(200, 200, 200), 1, Qt.DashLine)
-            painter.setPen(pen)
-            for i in range(len(self.points)-1):
-                painter.drawLine(self.points[i], self.points[i+1])
+            if len(scene.points) >= 2:
+                pen = QPen(QColor(200, 200, 200), 1, Qt.DashLine)
+                painter.setPen(pen)
+                for i in range(len(scene.points)-1):
+                    painter.drawLine(scene.points[i], scene.points[i+1])
 
-        if self.path is not None:
+        if scene.path is not None and intersects(rect, scene.path_bounds):
             pen = QPen(QColor(10, 100, 200), 2)
             painter.setPen(pen)
-            painter.drawPath(self.path)
+            painter.drawPath(scene.path)
 
-        if getattr(self, '_last_control_pairs', None) and self.show_control:
+        if scene.control_pairs and intersects(rect, scene.controls_bounds):
             pen = QPen(QColor(180, 50, 50), 1, Qt.DashLine)
             painter.setPen(pen)
-            for i, (C1, C2) in enumerate(self._last_control_pairs):
-                painter.drawLine(self.points[i], C1)
-                painter.drawLine(self.points[i+1], C2)
+            for i, (C1, C2) in enumerate(scene.control_pairs):
+                painter.drawLine(scene.points[i], C1)
+                painter.drawLine(scene.points[i+1], C2)
 
             pen = QPen(QColor(220, 120, 120), 1)
             painter.setPen(pen)
-            for (C1, C2) in self._last_control_pairs:
+            for (C1, C2) in scene.control_pairs:
                 painter.drawEllipse(C1, 3, 3)
                 painter.drawEllipse(C2, 3, 3)
 
 
-if __name__ == '__main__':
-    app = QApplication(sys.argv)
+def create_window():
     w = SplinePainter()
 
     def load_star():
@@ -173,5 +179,15 @@ if __name__ == '__main__':
     btns_layout.addWidget(btn_house)
     w.layout().addLayout(btns_layout)
 
+    return w
+
+
+def main():
+    app = QApplication(sys.argv)
+    w = create_window()
     w.show()
-    sys.exit(app.exec_())
+    sys.exit(app.exec())
+
+
+if __name__ == '__main__':
+    main()
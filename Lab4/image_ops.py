@@ -0,0 +1,283 @@
+"""Попиксельная обработка растра на NumPy.
+
+qimage_to_array / array_to_qimage дают представления без копирования между
+буфером QImage (Format_ARGB32, в памяти B, G, R, A) и массивом (h, w, 4);
+наружу, в apply_qimage, отдаётся уже самостоятельная копия.
+ImagePipeline накапливает операции и выполняет их лениво в run(): соседние
+поточечные операции сливаются там, где это не меняет результат, а сам
+проход идёт полосами строк в пуле потоков (NumPy отпускает GIL на
+векторных операциях).
+"""
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+BAND_HEIGHT = 128
+
+# Веса яркости в порядке каналов буфера (B, G, R)
+LUMA_BGR = (0.114, 0.587, 0.299)
+
+
+def qimage_to_array(image):
+    """Массив (h, w, 4) uint8 поверх памяти QImage формата ARGB32.
+
+    Пока используется массив, image должен оставаться живым.
+    """
+    from common.qt.QtGui import QImage
+    if image.format() not in (QImage.Format_ARGB32, QImage.Format_RGB32):
+        raise ValueError('image must be in Format_ARGB32 or Format_RGB32')
+    h, w = image.height(), image.width()
+    ptr = image.bits()
+    ptr.setsize(image.sizeInBytes())
+    arr = np.frombuffer(ptr, np.uint8).reshape(h, image.bytesPerLine())
+    return arr[:, :w * 4].reshape(h, w, 4)
+
+
+def array_to_qimage(arr):
+    """QImage, разделяющий память с массивом (h, w, 4) uint8.
+
+    Такой QImage нельзя хранить или передавать дальше: его неглубокие копии
+    на стороне C++ (QBrush, QPixmap) не удерживают массив.
+    """
+    from common.qt.QtGui import QImage
+    arr = np.ascontiguousarray(arr, dtype=np.uint8)
+    h, w = arr.shape[:2]
+    image = QImage(arr.data, w, h, w * 4, QImage.Format_ARGB32)
+    # QImage не владеет буфером — держим массив вместе с ним
+    image._array = arr
+    return image
+
+
+def _clip_u8(values):
+    return np.clip(values + 0.5, 0, 255).astype(np.uint8)
+
+
+class ImagePipeline:
+    """Цепочка операций над изображением, вычисляемая лениво"""
+
+    def __init__(self, workers=None, band_height=BAND_HEIGHT):
+        self.ops = []
+        self.workers = workers or os.cpu_count() or 1
+        self.band_height = band_height
+
+    # --- операции -------------------------------------------------------
+
+    def convolve(self, kernel):
+        kernel = np.asarray(kernel, dtype=np.float32)
+        if kernel.ndim != 2 or kernel.shape[0] % 2 == 0 or kernel.shape[1] % 2 == 0:
+            raise ValueError('kernel must be a 2D array with odd sides')
+        self.ops.append(('kernel', kernel))
+        return self
+
+    def blur(self, radius=1):
+        size = 2 * radius + 1
+        return self.convolve(np.full((size, size), 1.0 / (size * size)))
+
+    def sharpen(self, amount=1.0):
+        kernel = np.array([[0, -1, 0], [-1, 4, -1], [0, -1, 0]], dtype=np.float32) * amount
+        kernel[1, 1] += 1.0
+        return self.convolve(kernel)
+
+    def lut(self, table):
+        table = np.asarray(table)
+        if table.shape != (256,):
+            raise ValueError('table must have 256 entries')
+        self.ops.append(('lut', _clip_u8(table.astype(np.float32))))
+        return self
+
+    def gamma(self, g):
+        return self.lut(255.0 * (np.arange(256) / 255.0) ** (1.0 / g))
+
+    def color_matrix(self, matrix, offset=(0, 0, 0)):
+        """matrix 3x3 и offset задаются в порядке R, G, B"""
+        m = np.asarray(matrix, dtype=np.float32)
+        if m.shape != (3, 3):
+            raise ValueError('matrix must be 3x3')
+        # переставляем в порядок каналов буфера B, G, R
+        m = m[::-1, ::-1]
+        b = np.asarray(offset, dtype=np.float32)[::-1]
+        self.ops.append(('matrix', (m, b)))
+        return self
+
+    def grayscale(self):
+        return self.color_matrix([LUMA_BGR[::-1]] * 3)
+
+    def threshold(self, level=128):
+        self.grayscale()
+        return self.lut(np.where(np.arange(256) < level, 0, 255))
+
+    def equalize(self):
+        self.ops.append(('equalize', None))
+        return self
+
+    # --- план и выполнение ----------------------------------------------
+
+    def plan(self):
+        """Сливает соседние операции одного типа, если результат не меняется.
+
+        Каждая операция даёт тот же результат, что и выполненная отдельно:
+        значения округляются и ограничиваются диапазоном 0..255. Поэтому
+        таблицы сливаются всегда, матрицы — только целочисленные, когда первая
+        не выводит значения за 0..255, а свёртки не сливаются вовсе
+        (промежуточное округление и края изображения).
+        """
+        fused = []
+        for kind, arg in self.ops:
+            if fused and fused[-1][0] == kind:
+                prev = fused[-1][1]
+                if kind == 'lut':
+                    fused[-1] = (kind, arg[prev])
+                    continue
+                if kind == 'matrix' and _is_exact_matrix(*prev) and _is_integer(*arg):
+                    m1, b1 = prev
+                    m2, b2 = arg
+                    fused[-1] = (kind, (m2 @ m1, m2 @ b1 + b2))
+                    continue
+            fused.append((kind, arg))
+        return fused
+
+    def passes(self):
+        """Разбивает план на проходы: ядро или выравнивание + хвост поточечных операций"""
+        result = []
+        for kind, arg in self.plan():
+            if kind in ('kernel', 'equalize') or not result:
+                result.append([(kind, arg)])
+            else:
+                result[-1].append((kind, arg))
+        return result
+
+    def run(self, arr):
+        """Применяет цепочку к массиву (h, w, 4) uint8, возвращает новый массив"""
+        src = arr
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            for ops in self.passes():
+                src = self._run_pass(pool, src, ops)
+        if src is arr:
+            src = arr.copy()
+        return src
+
+    def apply_qimage(self, image):
+        """Обрабатывает QImage и возвращает новый QImage, владеющий своими пикселями"""
+        from common.qt.QtGui import QImage
+        image = image.convertToFormat(QImage.Format_ARGB32)
+        return array_to_qimage(self.run(qimage_to_array(image))).copy()
+
+    def _bands(self, h):
+        return [(y0, min(h, y0 + self.band_height)) for y0 in range(0, h, self.band_height)]
+
+    def _run_pass(self, pool, src, ops):
+        h = src.shape[0]
+        head_kind, head_arg = ops[0]
+        tail = ops
+        padded = None
+        if head_kind == 'kernel':
+            ry, rx = head_arg.shape[0] // 2, head_arg.shape[1] // 2
+            padded = np.pad(src[..., :3], ((ry, ry), (rx, rx), (0, 0)), mode='edge')
+            tail = ops[1:]
+        elif head_kind == 'equalize':
+            table = _equalize_table(pool, src, self._bands(h))
+            tail = [('lut', table)] + ops[1:]
+
+        dst = np.empty_like(src)
+
+        def work(band):
+            y0, y1 = band
+            if padded is not None:
+                rgb = _convolve_band(padded, head_arg, y0, y1, src.shape[1])
+            else:
+                rgb = src[y0:y1, :, :3]
+            if rgb.dtype != np.uint8:
+                rgb = _clip_u8(rgb)
+            for kind, arg in tail:
+                rgb = _apply_pointwise(kind, arg, rgb)
+            dst[y0:y1, :, :3] = rgb
+            dst[y0:y1, :, 3] = src[y0:y1, :, 3]
+
+        list(pool.map(work, self._bands(h)))
+        return dst
+
+
+def _is_integer(m, b):
+    return bool(np.all(m == np.round(m)) and np.all(b == np.round(b)))
+
+
+def _is_exact_matrix(m, b):
+    """Целочисленная матрица, переводящая куб 0..255 в себя.
+
+    Её результат не требует ни округления, ни ограничения, поэтому
+    произведение с другой целочисленной матрицей вычисляется без
+    погрешности и даёт то же, что две матрицы подряд.
+    """
+    if not _is_integer(m, b):
+        return False
+    lo = b + 255 * np.minimum(m, 0).sum(axis=1)
+    hi = b + 255 * np.maximum(m, 0).sum(axis=1)
+    return bool(np.all(lo >= 0) and np.all(hi <= 255))
+
+
+def _convolve_band(padded, kernel, y0, y1, w):
+    acc = np.zeros((y1 - y0, w, 3), dtype=np.float32)
+    for i in range(kernel.shape[0]):
+        for j in range(kernel.shape[1]):
+            k = kernel[i, j]
+            if k != 0:
+                acc += k * padded[y0 + i:y1 + i, j:j + w]
+    return acc
+
+
+def _apply_pointwise(kind, arg, rgb):
+    """Поточечная операция над uint8, результат снова uint8"""
+    if kind == 'lut':
+        return arg[rgb]
+    m, b = arg
+    return _clip_u8(rgb @ m.T + b)
+
+
+def _equalize_table(pool, src, bands):
+    def hist(band):
+        y0, y1 = band
+        gray = src[y0:y1, :, :3] @ np.asarray(LUMA_BGR, dtype=np.float32)
+        return np.bincount(_clip_u8(gray).ravel(), minlength=256)
+
+    counts = sum(pool.map(hist, bands))
+    cdf = np.cumsum(counts)
+    nonzero = cdf[cdf > 0]
+    if len(nonzero) == 0 or cdf[-1] == nonzero[0]:
+        return np.arange(256, dtype=np.uint8)
+    table = (cdf - nonzero[0]) * 255.0 / (cdf[-1] - nonzero[0])
+    return _clip_u8(np.maximum(table, 0))
+
+
+def benchmark(width=2048, height=2048, repeat=3):
+    """Мегапикселей в секунду для каждой операции на случайном изображении"""
+    rng = np.random.default_rng(0)
+    arr = rng.integers(0, 256, size=(height, width, 4), dtype=np.uint8)
+    cases = [
+        ('blur', lambda p: p.blur()),
+        ('sharpen', lambda p: p.sharpen()),
+        ('gamma', lambda p: p.gamma(2.2)),
+        ('color_matrix', lambda p: p.color_matrix([[0.393, 0.769, 0.189],
+                                                   [0.349, 0.686, 0.168],
+                                                   [0.272, 0.534, 0.131]])),
+        ('threshold', lambda p: p.threshold()),
+        ('equalize', lambda p: p.equalize()),
+    ]
+    mp = width * height / 1e6
+    results = {}
+    for name, build in cases:
+        pipeline = build(ImagePipeline())
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            pipeline.run(arr)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        results[name] = mp / best
+    return results
+
+
+if __name__ == '__main__':
+    for name, mps in benchmark().items():
+        print(f'{name:>14}: {mps:8.1f} MP/s')
@@ -1,27 +1,63 @@
-from PyQt5.QtWidgets import (QApplication, QWidget, QPushButton, QVBoxLayout,
-                             QHBoxLayout, QLabel, QCheckBox, QFileDialog, QSlider, QMessageBox)
-from PyQt5.QtGui import (QPainter, QPen, QColor, QPainterPath, QPixmap, QImage,
-                         QBrush, QPolygonF)
-from PyQt5.QtCore import Qt, QPointF, QRectF
+import os
 import sys
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# привязка, под которую написана лабораторная (как в launcher.LABS);
+# QT_API из окружения имеет приоритет
+os.environ.setdefault('QT_API', 'PyQt5')
+
+from common.qt import event_pos
+from common.qt.QtWidgets import (QApplication, QWidget, QPushButton, QVBoxLayout,
+                                 QHBoxLayout, QLabel, QCheckBox, QFileDialog, QSlider, QMessageBox,
+                                 QComboBox)
+from common.qt.QtGui import QPainter, QPen, QColor, QPixmap, QImage, QBrush, QTransform
+from common.qt.QtCore import Qt, QPointF, QRectF, QSizeF, QThread, pyqtSignal
+from common.image_store import default_store, memory_usage
+from common.spline import build_composite_bezier, hit_point
+from common.tile_renderer import (make_backends, draw_frame_times, intersects,
+                                   path_bounds, points_bounds)
+
+
+def image_mask(image, threshold=128):
+    """Бинарная маска QImage: массив (h, w) uint8, 1 — тёмный пиксель"""
+    from tracing import threshold_rows
+    gray = image.convertToFormat(QImage.Format_Grayscale8)
+    ptr = gray.constBits()
+    ptr.setsize(gray.sizeInBytes())
+    # сравнение с порогом создаёт новый массив, он не ссылается на буфер gray
+    return threshold_rows(ptr, gray.width(), gray.height(),
+                          gray.bytesPerLine(), threshold)
+
 
 class RasterResource:
-    def __init__(self, image=None):
-        self.original = None
-        self.pixmap = None
+    """Растр в общем хранилище: исходник и текущая масштабированная версия"""
+
+    def __init__(self, image=None, store=default_store):
+        self.store = store
+        self._original = None
+        self._scaled = None
         if image is not None:
             self.set_image(image)
 
+    @property
+    def original(self):
+        return self._original.image() if self._original is not None else None
+
     def set_image(self, image):
         """Принимает QImage или QPixmap"""
         if isinstance(image, QPixmap):
-            self.original = image.toImage()
-        elif isinstance(image, QImage):
-            self.original = image
-        else:
+            image = image.toImage()
+        elif not isinstance(image, QImage):
             raise TypeError('image must be QImage or QPixmap')
-        self.pixmap = QPixmap.fromImage(self.original)
+        self.release()
+        self._original = self.store.put(image)
+
+    def release(self):
+        for handle in (self._original, self._scaled):
+            if handle is not None:
+                handle.release()
+        self._original = None
+        self._scaled = None
 
     def load_from_file(self, filename):
         img = QImage()
@@ -31,24 +67,103 @@ class RasterResource:
         self.set_image(img)
 
     def scale(self, w, h, keep_aspect=True):
-        if self.original is None:
+        if self._original is None:
+            return
+        from common.resample import MODES, scale_image
+        scaled = self.store.derive(
+            self._original, ('scaled', w, h, keep_aspect),
+            lambda img: scale_image(img, w, h, MODES[1], keep_aspect))
+        if self._scaled is not None:
+            self._scaled.release()
+        self._scaled = scaled
+
+    def apply_pipeline(self, pipeline):
+        """Применяет image_ops.ImagePipeline к исходному изображению"""
+        if self._original is None:
             return
-        if keep_aspect:
-            self.pixmap = QPixmap.fromImage(self.original).scaled(w, h, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-        else:
-            self.pixmap = QPixmap.fromImage(self.original).scaled(w, h, Qt.IgnoreAspectRatio, Qt.SmoothTransformation)
+        self.set_image(pipeline.apply_qimage(self.original))
+
+    def to_mask(self, threshold=128):
+        """Бинарная маска исходного изображения (см. image_mask)"""
+        if self._original is None:
+            return None
+        return image_mask(self.original, threshold)
+
+    def get_image(self):
+        """Текущий (масштабированный) растр как QImage — его можно рисовать вне GUI-потока"""
+        handle = self._scaled or self._original
+        return handle.image() if handle is not None else None
 
     def get_pixmap(self):
-        return self.pixmap
+        image = self.get_image()
+        return QPixmap.fromImage(image) if image is not None else None
 
     def create_brush(self, tile=True):
-        if self.pixmap is None:
+        image = self.get_image()
+        if image is None:
             return None
-        if tile:
-            brush = QBrush(self.pixmap)
-        else:
-            brush = QBrush(self.pixmap)
-        return brush
+        return QBrush(image)
+
+
+class TraceThread(QThread):
+    """Векторизация растра вне GUI-потока.
+
+    Контуры строятся в пикселях исходного изображения; перевод в
+    координаты виджета делается при отрисовке.
+    """
+    traced = pyqtSignal(int, object)
+
+    def __init__(self, image, generation, parent=None):
+        super().__init__(parent)
+        self.image = image
+        self.generation = generation
+
+    def run(self):
+        from tracing import trace_mask
+        paths = []
+        for outline in trace_mask(image_mask(self.image)):
+            P = [QPointF(x, y) for x, y in outline]
+            paths.append(build_composite_bezier(P)[0])
+        self.traced.emit(self.generation, paths)
+
+
+class RasterScene:
+    """Снимок состояния PainterRaster для отрисовки вне GUI-потока"""
+
+    def __init__(self, widget):
+        self.image = widget.raster.get_image() if widget.show_raster else None
+        self.image_rect = None
+        if self.image is not None:
+            self.image_rect = QRectF(widget.raster_origin(), QSizeF(self.image.size()))
+
+        # контуры хранятся в пикселях исходного растра
+        self.traced = []
+        self.trace_transform = None
+        scaled = widget.raster.get_image()
+        if widget.traced_paths and scaled is not None:
+            base = widget.raster.original
+            origin = widget.raster_origin()
+            t = QTransform()
+            t.translate(origin.x(), origin.y())
+            t.scale(scaled.width() / base.width(), scaled.height() / base.height())
+            # вершины контуров лежат в центрах пикселей
+            t.translate(0.5, 0.5)
+            self.trace_transform = t
+            self.traced = [(path, path_bounds(path, 1, t)) for path in widget.traced_paths]
+
+        self.points = list(widget.base_points)
+        self.path = widget.path
+        self.path_bounds = path_bounds(widget.path, 2) if widget.path is not None else None
+        self.brush = None
+        if widget.path is not None and widget.fill_with_pattern:
+            # кисть из QImage создаётся в GUI-потоке, до отрисовки плитками
+            self.brush = widget.pattern_resource.create_brush(tile=True)
+        self.fill_with_pattern = widget.fill_with_pattern
+        self.control_pairs = list(widget._last_control_pairs or [])
+        # границы групп объектов, чтобы плитки пропускали то, что их не касается
+        self.points_bounds = points_bounds(self.points, 5)
+        self.controls_bounds = points_bounds(
+            self.points + [c for pair in self.control_pairs for c in pair], 4)
 
 
 class PainterRaster(QWidget):
@@ -59,12 +174,14 @@ class PainterRaster(QWidget):
 
         self.base_points = []  
         self.path = None       
+        self.traced_paths = []  # в пикселях исходного растра
+        self._trace_thread = None
+        self._trace_generation = 0
         self.raster = RasterResource()
         self.show_raster = True
         self.fill_with_pattern = True
 
-        self.pattern = self.make_default_pattern()
-        self.pattern_resource = RasterResource(self.pattern.toImage())
+        self._pattern_resource = None
 
         btn_layout = QHBoxLayout()
         btn_load = QPushButton('Загрузить растр...')
@@ -77,6 +194,8 @@ class PainterRaster(QWidget):
         btn_build.clicked.connect(self.build_spline)
         btn_fill = QPushButton('Fill shape with pattern')
         btn_fill.clicked.connect(self.fill_shape_with_pattern)
+        self.btn_trace = QPushButton('Векторизовать растр')
+        self.btn_trace.clicked.connect(self.trace_raster)
 
         self.chk_show_raster = QCheckBox('Показать растр')
         self.chk_show_raster.setChecked(True)
@@ -86,13 +205,21 @@ class PainterRaster(QWidget):
         self.chk_pattern.setChecked(True)
         self.chk_pattern.stateChanged.connect(self.toggle_pattern)
 
+        self.backends = make_backends()
+        self.backend = self.backends[0]
+        self.backend_combo = QComboBox()
+        self.backend_combo.addItems([b.name for b in self.backends])
+        self.backend_combo.currentIndexChanged.connect(self.set_backend)
+
         btn_layout.addWidget(btn_load)
         btn_layout.addWidget(btn_scale)
         btn_layout.addWidget(btn_clear)
         btn_layout.addWidget(btn_build)
         btn_layout.addWidget(btn_fill)
+        btn_layout.addWidget(self.btn_trace)
         btn_layout.addWidget(self.chk_show_raster)
         btn_layout.addWidget(self.chk_pattern)
+        btn_layout.addWidget(self.backend_combo)
         btn_layout.addStretch()
 
         instr = QLabel('ЛКМ: добавить точку. ПКМ по точке: удалить. Перетащить — переместить.')
@@ -103,38 +230,59 @@ class PainterRaster(QWidget):
         self.slider.setValue(100)
         self.slider.valueChanged.connect(self.on_slider_changed)
         lbl = QLabel('Масштаб растра (%)')
+        self.lbl_memory = QLabel()
+        self.update_memory_label()
 
         layout = QVBoxLayout(self)
         layout.addLayout(btn_layout)
         layout.addWidget(instr)
         layout.addWidget(lbl)
         layout.addWidget(self.slider)
+        layout.addWidget(self.lbl_memory)
 
         self.drag_index = -1
         self._last_control_pairs = None
 
+    @property
+    def pattern_resource(self):
+        # шаблон нужен только для заливки, строим его при первом использовании
+        if self._pattern_resource is None:
+            self._pattern_resource = RasterResource(self.make_default_pattern())
+        return self._pattern_resource
+
     def make_default_pattern(self):
         size = 16
-        pm = QPixmap(size, size)
-        pm.fill(QColor(255, 255, 255, 0))
-        p = QPainter(pm)
+        img = QImage(size, size, QImage.Format_ARGB32_Premultiplied)
+        img.fill(QColor(255, 255, 255, 0))
+        p = QPainter(img)
         p.setPen(QPen(Qt.black, 1))
         p.drawLine(0, 0, size, size)
         p.drawLine(0, size, size, 0)
         p.end()
-        return pm
+        return img
 
     def toggle_raster(self, state):
-        self.show_raster = state == Qt.Checked
+        self.show_raster = self.chk_show_raster.isChecked()
         self.update()
 
     def toggle_pattern(self, state):
-        self.fill_with_pattern = state == Qt.Checked
+        self.fill_with_pattern = self.chk_pattern.isChecked()
+        self.update()
+
+    def set_backend(self, index):
+        self.backend = self.backends[index]
         self.update()
 
+    def update_memory_label(self):
+        used = memory_usage() / 2**20
+        budget = default_store.budget / 2**20
+        self.lbl_memory.setText(f'Память растров: {used:.1f} / {budget:.0f} МБ')
+
     def clear_points(self):
         self.base_points = []
         self.path = None
+        self._last_control_pairs = None
+        self.traced_paths = []
         self.update()
 
     def load_raster(self):
@@ -143,22 +291,28 @@ class PainterRaster(QWidget):
             return
         try:
             self.raster.load_from_file(fname)
+            # контуры старого растра больше не подходят, в том числе ещё не готовые
+            self.traced_paths = []
+            self._trace_generation += 1
             self.apply_slider_scale()
+            self.update_memory_label()
             self.update()
         except Exception as e:
             QMessageBox.critical(self, 'Ошибка', str(e))
 
     def scale_raster_half(self):
-        if self.raster.get_pixmap() is None:
+        img = self.raster.get_image()
+        if img is None:
             return
-        pm = self.raster.get_pixmap()
-        w = max(1, pm.width() // 2)
-        h = max(1, pm.height() // 2)
+        w = max(1, img.width() // 2)
+        h = max(1, img.height() // 2)
         self.raster.scale(w, h, keep_aspect=False)
+        self.update_memory_label()
         self.update()
 
     def on_slider_changed(self, val):
         self.apply_slider_scale()
+        self.update_memory_label()
         self.update()
 
     def apply_slider_scale(self):
@@ -171,66 +325,60 @@ class PainterRaster(QWidget):
         self.raster.scale(w, h, keep_aspect=True)
 
     def mousePressEvent(self, event):
-        p = event.pos()
+        p = event_pos(event)
         if event.button() == Qt.LeftButton:
-            idx = self.find_nearest_point_index(p)
-            if idx is not None and (self.base_points[idx] - p).manhattanLength() < 10:
+            idx = hit_point(self.base_points, p, 10)
+            if idx is not None:
                 self.drag_index = idx
             else:
-                self.base_points.append(QPointF(p))
+                self.base_points.append(p)
                 self.build_spline()
         elif event.button() == Qt.RightButton:
-            idx = self.find_nearest_point_index(p)
-            if idx is not None and (self.base_points[idx] - p).manhattanLength() < 10:
+            idx = hit_point(self.base_points, p, 10)
+            if idx is not None:
                 del self.base_points[idx]
                 self.build_spline()
 
     def mouseMoveEvent(self, event):
         if self.drag_index != -1:
-            self.base_points[self.drag_index] = QPointF(event.pos())
+            self.base_points[self.drag_index] = event_pos(event)
             self.build_spline()
 
     def mouseReleaseEvent(self, event):
         self.drag_index = -1
 
-    def find_nearest_point_index(self, pos):
-        best_i = None
-        best_d = None
-        for i, pt in enumerate(self.base_points):
-            d = (pt - pos).manhattanLength()
-            if best_d is None or d < best_d:
-                best_d = d
-                best_i = i
-        return best_i
+    def raster_origin(self):
+        img = self.raster.get_image()
+        return QPointF(int((self.width() - img.width())/2), 80)
 
-    def build_spline(self):
-        n = len(self.base_points)
-        if n < 2:
-            self.path = None
-            self._last_control_pairs = None
-            self.update()
+    def trace_raster(self):
+        """Контуры растра -> наборы опорных точек -> составные сплайны"""
+        if self.raster.original is None or self._trace_thread is not None:
             return
-        P = self.base_points
-        T = [QPointF(0, 0) for _ in range(n)]
-        if n == 2:
-            T[0] = P[1] - P[0]
-            T[1] = P[1] - P[0]
-        else:
-            for i in range(1, n-1):
-                T[i] = (P[i+1] - P[i-1]) * 0.5
-            T[0] = P[1] - P[0]
-            T[n-1] = P[n-1] - P[n-2]
-        control_pairs = []
-        for i in range(n-1):
-            C1 = P[i] + T[i] * (1.0/3.0)
-            C2 = P[i+1] - T[i+1] * (1.0/3.0)
-            control_pairs.append((C1, C2))
-        path = QPainterPath(P[0])
-        for i in range(n-1):
-            C1, C2 = control_pairs[i]
-            path.cubicTo(C1, C2, P[i+1])
-        self.path = path
-        self._last_control_pairs = control_pairs
+        self.btn_trace.setEnabled(False)
+        thread = TraceThread(self.raster.original, self._trace_generation, self)
+        thread.traced.connect(self.on_traced)
+        thread.finished.connect(self.on_trace_finished)
+        self._trace_thread = thread
+        thread.start()
+
+    def on_traced(self, generation, paths):
+        if generation == self._trace_generation:
+            self.traced_paths = paths
+            self.update()
+
+    def on_trace_finished(self):
+        self._trace_thread.deleteLater()
+        self._trace_thread = None
+        self.btn_trace.setEnabled(True)
+
+    def closeEvent(self, event):
+        if self._trace_thread is not None:
+            self._trace_thread.wait()
+        super().closeEvent(event)
+
+    def build_spline(self):
+        self.path, self._last_control_pairs = build_composite_bezier(self.base_points)
         self.update()
 
     def fill_shape_with_pattern(self):
@@ -240,57 +388,72 @@ class PainterRaster(QWidget):
 
     def paintEvent(self, event):
         painter = QPainter(self)
+        self.backend.render(painter, self.size(), self.draw_scene, RasterScene(self),
+                            self.devicePixelRatioF())
+        draw_frame_times(painter, self.backends, self.backend)
+
+    @staticmethod
+    def draw_scene(painter, scene, rect):
         painter.setRenderHint(QPainter.Antialiasing)
 
-        painter.fillRect(self.rect(), QColor(255, 255, 255))
+        painter.fillRect(rect, QColor(255, 255, 255))
 
-        if self.show_raster and self.raster.get_pixmap() is not None:
-            pm = self.raster.get_pixmap()
-            x = (self.width() - pm.width())/2
-            y = 80  
-            painter.drawPixmap(int(x), int(y), pm)
+        if scene.image is not None and intersects(rect, scene.image_rect):
+            painter.drawImage(scene.image_rect.topLeft(), scene.image)
 
-        pen = QPen(Qt.black, 1)
-        painter.setPen(pen)
-        for pt in self.base_points:
-            painter.drawEllipse(pt, 4, 4)
-
-        if len(self.base_points) >= 2:
-            pen = QPen(QColor(200, 200, 200), 1, Qt.DashLine)
+        visible = [path for path, bounds in scene.traced if intersects(rect, bounds)]
+        if visible:
+            painter.save()
+            painter.setTransform(scene.trace_transform, True)
+            pen = QPen(QColor(0, 150, 80), 1)
+            pen.setCosmetic(True)
             painter.setPen(pen)
-            for i in range(len(self.base_points)-1):
-                painter.drawLine(self.base_points[i], self.base_points[i+1])
+            painter.setBrush(Qt.NoBrush)
+            for path in visible:
+                painter.drawPath(path)
+            painter.restore()
 
-        if self.path is not None:
-            if self.fill_with_pattern:
-                brush = self.pattern_resource.create_brush(tile=True)
-                if brush is not None:
+        pen = QPen(Qt.black, 1)
+        painter.setPen(pen)
+        if intersects(rect, scene.points_bounds):
+            for pt in scene.points:
+                painter.drawEllipse(pt, 4, 4)
+
+            if len(scene.points) >= 2:
+                pen = QPen(QColor(200, 200, 200), 1, Qt.DashLine)
+                painter.setPen(pen)
+                for i in range(len(scene.points)-1):
+                    painter.drawLine(scene.points[i], scene.points[i+1])
+
+        if scene.path is not None and intersects(rect, scene.path_bounds):
+            if scene.fill_with_pattern:
+                if scene.brush is not None:
                     painter.save()
-                    painter.setBrush(brush)
+                    painter.setBrush(scene.brush)
                     painter.setPen(Qt.NoPen)
-                    painter.drawPath(self.path)
+                    painter.drawPath(scene.path)
                     painter.restore()
             else:
                 painter.save()
                 painter.setBrush(QColor(200, 220, 255, 150))
                 painter.setPen(Qt.NoPen)
-                painter.drawPath(self.path)
+                painter.drawPath(scene.path)
                 painter.restore()
 
             pen = QPen(QColor(10, 100, 200), 2)
             painter.setPen(pen)
             painter.setBrush(Qt.NoBrush)
-            painter.drawPath(self.path)
+            painter.drawPath(scene.path)
 
-        if getattr(self, '_last_control_pairs', None) and self._last_control_pairs is not None:
+        if scene.control_pairs and intersects(rect, scene.controls_bounds):
             pen = QPen(QColor(180, 50, 50), 1, Qt.DashLine)
             painter.setPen(pen)
-            for i, (C1, C2) in enumerate(self._last_control_pairs):
-                painter.drawLine(self.base_points[i], C1)
-                painter.drawLine(self.base_points[i+1], C2)
+            for i, (C1, C2) in enumerate(scene.control_pairs):
+                painter.drawLine(scene.points[i], C1)
+                painter.drawLine(scene.points[i+1], C2)
             pen = QPen(QColor(220, 120, 120), 1)
             painter.setPen(pen)
-            for (C1, C2) in self._last_control_pairs:
+            for (C1, C2) in scene.control_pairs:
                 painter.drawEllipse(C1, 3, 3)
                 painter.drawEllipse(C2, 3, 3)
 
@@ -299,8 +462,7 @@ class PainterRaster(QWidget):
         self.build_spline()
 
 
-if __name__ == '__main__':
-    app = QApplication(sys.argv)
+def create_window():
     w = PainterRaster()
 
     btns = QHBoxLayout()
@@ -308,6 +470,15 @@ if __name__ == '__main__':
     btn_star.clicked.connect(w.load_star_preset)
     btns.addWidget(btn_star)
     w.layout().addLayout(btns)
+    return w
+
 
+def main():
+    app = QApplication(sys.argv)
+    w = create_window()
     w.show()
-    sys.exit(app.exec_())
+    sys.exit(app.exec())
+
+
+if __name__ == '__main__':
+    main()
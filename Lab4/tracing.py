@@ -0,0 +1,205 @@
+"""Векторизация растра: порог -> marching squares -> упрощение контуров.
+
+Модуль не зависит от Qt: на вход подаётся бинарная маска (массив (h, w)
+uint8, 1 — пиксель объекта), на выходе — списки точек (x, y) для
+build_spline. Номера случаев marching squares считаются NumPy сразу для
+полосы строк, а сегменты строятся только для граничных ячеек.
+"""
+import numpy as np
+
+# Сегменты для каждого случая marching squares.
+# Индекс: tl*8 + tr*4 + br*2 + bl, рёбра: 0 — верх, 1 — право, 2 — низ, 3 — лево.
+# Сегменты направлены так, что объект остаётся справа (ось y вниз), поэтому
+# из каждой точки контура выходит ровно один сегмент.
+SEGMENTS = (
+    (),
+    ((3, 2),),
+    ((2, 1),),
+    ((3, 1),),
+    ((1, 0),),
+    ((3, 0), (1, 2)),
+    ((2, 0),),
+    ((3, 0),),
+    ((0, 3),),
+    ((0, 2),),
+    ((0, 1), (2, 3)),
+    ((0, 1),),
+    ((1, 3),),
+    ((1, 2),),
+    ((2, 3),),
+    (),
+)
+
+# Середины рёбер ячейки (x, y) в удвоенных координатах
+EDGE_OFFSETS = ((1, 0), (2, 1), (1, 2), (0, 1))
+
+BAND_HEIGHT = 256
+
+
+def threshold_rows(data, width, height, bytes_per_line, threshold=128):
+    """Бинаризация 8-битного полутонового буфера: тёмные пиксели -> 1"""
+    gray = np.frombuffer(data, np.uint8, count=height * bytes_per_line)
+    gray = gray.reshape(height, bytes_per_line)[:, :width]
+    return (gray < threshold).view(np.uint8)
+
+
+def padded_band(mask, y0, y1):
+    """Строки y0..y1-1 маски с пустой рамкой (строки -1 и h тоже пустые).
+
+    Рамка нужна, чтобы все контуры получились замкнутыми; номера строк
+    y0, y1 заданы в координатах маски с рамкой.
+    """
+    h, w = mask.shape
+    band = np.zeros((y1 - y0, w + 2), dtype=np.uint8)
+    lo = max(y0, 1)
+    hi = min(y1, h + 1)
+    if lo < hi:
+        band[lo - y0:hi - y0, 1:-1] = mask[lo - 1:hi - 1]
+    return band
+
+
+def trace_band(band, y0):
+    """Сегменты контуров для ячеек между строками band[i] и band[i + 1].
+
+    y0 — номер первой строки полосы в общей маске. Возвращает массивы
+    начал и концов сегментов (n, 2) в удвоенных целочисленных координатах,
+    чтобы они совпадали на границах соседних полос.
+    """
+    tl = band[:-1, :-1]
+    tr = band[:-1, 1:]
+    br = band[1:, 1:]
+    bl = band[1:, :-1]
+    case = (tl << 3) | (tr << 2) | (br << 1) | bl
+    ys, xs = np.nonzero((case != 0) & (case != 15))
+    cases = case[ys, xs]
+    gx = 2 * xs.astype(np.int64)
+    gy = 2 * (ys.astype(np.int64) + y0)
+
+    starts = []
+    ends = []
+    for c in range(1, 15):
+        sel = cases == c
+        if not sel.any():
+            continue
+        cx = gx[sel]
+        cy = gy[sel]
+        for a, b in SEGMENTS[c]:
+            ax, ay = EDGE_OFFSETS[a]
+            bx, by = EDGE_OFFSETS[b]
+            starts.append(np.stack((cx + ax, cy + ay), axis=1))
+            ends.append(np.stack((cx + bx, cy + by), axis=1))
+    if not starts:
+        empty = np.empty((0, 2), dtype=np.int64)
+        return empty, empty
+    return np.concatenate(starts), np.concatenate(ends)
+
+
+def join_segments(starts, ends):
+    """Собирает направленные сегменты в замкнутые контуры.
+
+    Возвращает список массивов (k, 2) точек контура в порядке обхода.
+    """
+    if len(starts) == 0:
+        return []
+    width = int(max(starts[:, 0].max(), ends[:, 0].max())) + 1
+    start_ids = starts[:, 1] * width + starts[:, 0]
+    end_ids = ends[:, 1] * width + ends[:, 0]
+    # next_seg[i] — сегмент, который начинается там, где кончается i
+    order = np.argsort(start_ids, kind='stable')
+    next_seg = order[np.searchsorted(start_ids[order], end_ids)].tolist()
+
+    contours = []
+    visited = bytearray(len(next_seg))
+    # обход по возрастанию начала: контур начинается с верхней левой точки
+    # и не зависит от разбиения на полосы
+    for first in order.tolist():
+        if visited[first]:
+            continue
+        cycle = []
+        i = first
+        while not visited[i]:
+            visited[i] = 1
+            cycle.append(i)
+            i = next_seg[i]
+        contours.append(starts[cycle])
+    return contours
+
+
+def _line_distances(points, a, b):
+    dx = b[0] - a[0]
+    dy = b[1] - a[1]
+    length = (dx * dx + dy * dy) ** 0.5
+    px = points[:, 0] - a[0]
+    py = points[:, 1] - a[1]
+    if length == 0:
+        return np.hypot(px, py)
+    return np.abs(dy * px - dx * py) / length
+
+
+def simplify(points, epsilon):
+    """Упрощение ломаной алгоритмом Дугласа — Пекера (без рекурсии).
+
+    Принимает последовательность точек (x, y), возвращает массив (k, 2).
+    """
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    n = len(points)
+    if n < 3:
+        return points
+    keep = np.zeros(n, dtype=bool)
+    keep[0] = keep[n - 1] = True
+    stack = [(0, n - 1)]
+    while stack:
+        first, last = stack.pop()
+        if last - first < 2:
+            continue
+        d = _line_distances(points[first + 1:last], points[first], points[last])
+        i = int(np.argmax(d))
+        if d[i] > epsilon:
+            best_i = first + 1 + i
+            keep[best_i] = True
+            stack.append((first, best_i))
+            stack.append((best_i, last))
+    return points[keep]
+
+
+def simplify_closed(contour, epsilon):
+    """Упрощает замкнутый контур, разрезая его в самой дальней от начала точке"""
+    contour = np.asarray(contour, dtype=np.float64).reshape(-1, 2)
+    far = int(np.argmax(((contour - contour[0]) ** 2).sum(axis=1)))
+    first = simplify(contour[:far + 1], epsilon)
+    second = simplify(np.concatenate((contour[far:], contour[:1])), epsilon)
+    return np.concatenate((first, second[1:-1]))
+
+
+def trace_mask(mask, epsilon=1.5, min_points=8, band_height=BAND_HEIGHT):
+    """Возвращает списки точек (x, y) контуров маски в координатах пикселей.
+
+    Каждый список замкнут (последняя точка совпадает с первой), как
+    предустановки для build_spline. Маска обрабатывается полосами по
+    band_height строк, чтобы не держать в памяти номера случаев для всего
+    изображения.
+    """
+    mask = np.asarray(mask, dtype=np.uint8)
+    if mask.size == 0:
+        return []
+    total = mask.shape[0] + 2
+    starts = []
+    ends = []
+    for y0 in range(0, total - 1, band_height):
+        # полосы перекрываются на одну строку
+        band = padded_band(mask, y0, min(total, y0 + band_height + 1))
+        s, e = trace_band(band, y0)
+        starts.append(s)
+        ends.append(e)
+
+    outlines = []
+    for contour in join_segments(np.concatenate(starts), np.concatenate(ends)):
+        if len(contour) < min_points:
+            continue
+        # из удвоенных координат рамки обратно в пиксели изображения
+        pts = simplify_closed(contour / 2.0 - 1.0, epsilon)
+        if len(pts) < 3:
+            continue
+        pts = [tuple(p) for p in pts.tolist()]
+        outlines.append(pts + [pts[0]])
+    return outlines
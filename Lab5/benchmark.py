@@ -0,0 +1,162 @@
+"""Сравнение режимов масштабирования BMViewer по скорости и качеству.
+
+Запуск без окна (offscreen-платформа Qt):
+
+    python benchmark.py [файлы.bmp ...] [--csv results.csv]
+                        [--baseline old.csv] [--tolerance 1.25]
+
+Для каждого изображения, масштаба 10%–300% и режима записываются время,
+пиковая память и PSNR/SSIM относительно эталона Lanczos-3. С --baseline
+скрипт завершается с кодом 1, если какой-то режим стал медленнее, чем
+baseline * tolerance.
+"""
+import argparse
+import csv
+import os
+import sys
+import time
+import tracemalloc
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+import numpy as np
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+
+from common.qt.QtGui import QGuiApplication, QImage
+from common.resample import MODES, image_to_array, reference_image, scale_image
+
+DEFAULT_CORPUS = [os.path.join(HERE, 'Рисунок.bmp')]
+ZOOMS = (10, 25, 50, 75, 100, 150, 200, 300)
+FIELDS = ('image', 'mode', 'zoom', 'width', 'height', 'time_ms', 'peak_kb', 'psnr', 'ssim')
+
+# абсолютный допуск, чтобы не ловить шум на очень быстрых операциях
+MIN_SLOWDOWN_MS = 2.0
+
+
+def luma(arr):
+    return arr[..., 0] * 0.114 + arr[..., 1] * 0.587 + arr[..., 2] * 0.299
+
+
+def psnr(a, b):
+    mse = np.mean((a - b) ** 2)
+    if mse == 0:
+        return float('inf')
+    return 10 * np.log10(255.0 ** 2 / mse)
+
+
+def _box_mean(x, r):
+    # среднее по окну (2r+1)^2 через интегральное изображение
+    pad = np.pad(x, r + 1, mode='edge')
+    s = pad.cumsum(0).cumsum(1)
+    k = 2 * r + 1
+    total = s[k:, k:] - s[:-k, k:] - s[k:, :-k] + s[:-k, :-k]
+    return total[:x.shape[0], :x.shape[1]] / (k * k)
+
+
+def ssim(a, b, r=3):
+    """SSIM по яркости с квадратным окном 7x7"""
+    c1 = (0.01 * 255) ** 2
+    c2 = (0.03 * 255) ** 2
+    mu_a = _box_mean(a, r)
+    mu_b = _box_mean(b, r)
+    var_a = _box_mean(a * a, r) - mu_a ** 2
+    var_b = _box_mean(b * b, r) - mu_b ** 2
+    cov = _box_mean(a * b, r) - mu_a * mu_b
+    s = ((2 * mu_a * mu_b + c1) * (2 * cov + c2)) / ((mu_a ** 2 + mu_b ** 2 + c1) * (var_a + var_b + c2))
+    return float(s.mean())
+
+
+def measure(image, w, h, mode, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = scale_image(image, w, h, mode)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    # NumPy-буферы видны tracemalloc, память Qt — нет, поэтому добавляем
+    # размер результата
+    tracemalloc.start()
+    result = scale_image(image, w, h, mode)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, best * 1000.0, (peak + result.sizeInBytes()) / 1024.0
+
+
+def run(corpus, zooms=ZOOMS, repeat=3):
+    rows = []
+    for path in corpus:
+        image = QImage(path)
+        if image.isNull():
+            raise IOError(f'Не удалось загрузить изображение: {path}')
+        name = os.path.basename(path)
+        for zoom in zooms:
+            w = max(1, int(image.width() * zoom / 100.0))
+            h = max(1, int(image.height() * zoom / 100.0))
+            ref = luma(reference_image(image, w, h))
+            for mode in MODES:
+                result, ms, peak_kb = measure(image, w, h, mode, repeat)
+                out = luma(image_to_array(result).astype(np.float64))
+                rows.append({
+                    'image': name, 'mode': mode, 'zoom': zoom,
+                    'width': w, 'height': h,
+                    'time_ms': round(ms, 3), 'peak_kb': round(peak_kb, 1),
+                    'psnr': round(psnr(out, ref), 3), 'ssim': round(ssim(out, ref), 5),
+                })
+    return rows
+
+
+def write_csv(rows, fname):
+    with open(fname, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDS)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def check_regressions(rows, baseline_file, tolerance):
+    """Список строк о замедлениях относительно baseline"""
+    with open(baseline_file, newline='', encoding='utf-8') as f:
+        baseline = {(r['image'], r['mode'], int(r['zoom'])): float(r['time_ms'])
+                    for r in csv.DictReader(f)}
+    slow = []
+    for row in rows:
+        old = baseline.get((row['image'], row['mode'], row['zoom']))
+        if old is None:
+            continue
+        new = row['time_ms']
+        if new > old * tolerance and new - old > MIN_SLOWDOWN_MS:
+            slow.append(f"{row['image']} {row['mode']} {row['zoom']}%: "
+                        f"{old:.2f} -> {new:.2f} ms")
+    return slow
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Бенчмарк режимов масштабирования BMViewer')
+    parser.add_argument('images', nargs='*', default=DEFAULT_CORPUS)
+    parser.add_argument('--csv', default='resample_benchmark.csv')
+    parser.add_argument('--baseline')
+    parser.add_argument('--tolerance', type=float, default=1.25)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args(argv)
+
+    app = QGuiApplication.instance() or QGuiApplication(sys.argv[:1])
+    rows = run(args.images, repeat=args.repeat)
+    write_csv(rows, args.csv)
+    for row in rows:
+        print(f"{row['image']:>16} {row['mode']:>24} {row['zoom']:>4}% "
+              f"{row['time_ms']:9.2f} ms {row['peak_kb']:10.1f} KB "
+              f"PSNR {row['psnr']:7.2f} SSIM {row['ssim']:.4f}")
+
+    if args.baseline:
+        slow = check_regressions(rows, args.baseline, args.tolerance)
+        if slow:
+            print('Замедления:')
+            for line in slow:
+                print('  ' + line)
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,10 +1,19 @@
+import os
 import sys
-from PyQt5.QtWidgets import (
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# привязка, под которую написана лабораторная (как в launcher.LABS);
+# QT_API из окружения имеет приоритет
+os.environ.setdefault('QT_API', 'PyQt5')
+
+from common.qt.QtWidgets import (
     QApplication, QWidget, QLabel, QPushButton, QVBoxLayout, QHBoxLayout,
     QFileDialog, QComboBox, QSlider
 )
-from PyQt5.QtGui import QPixmap, QImage
-from PyQt5.QtCore import Qt
+from common.qt.QtGui import QPixmap, QImage
+from common.qt.QtCore import Qt, QTimer
+from common.image_store import default_store, memory_usage
+from common.resample import MODES, scale_image
 
 
 class BMViewer(QWidget):
@@ -24,10 +33,18 @@ class BMViewer(QWidget):
         self.scale_slider = QSlider(Qt.Horizontal)
         self.scale_slider.setRange(10, 300)
         self.scale_slider.setValue(100)
-        self.scale_slider.valueChanged.connect(self.update_scaled_image)
+        self.scale_slider.valueChanged.connect(self.on_scale_changed)
+        self.scale_slider.sliderReleased.connect(self.update_scaled_image)
+
+        # сплайновый режим медленный: пока масштаб меняется, показываем
+        # линейную интерполяцию, а сплайн считаем после паузы
+        self.spline_timer = QTimer(self)
+        self.spline_timer.setSingleShot(True)
+        self.spline_timer.setInterval(250)
+        self.spline_timer.timeout.connect(self.update_scaled_image)
 
         self.mode_combo = QComboBox()
-        self.mode_combo.addItems(["По соседним", "Линейная интерполяция", "Сплайновая интерполяция"])
+        self.mode_combo.addItems(MODES)
         self.mode_combo.currentIndexChanged.connect(self.update_scaled_image)
 
         controls = QHBoxLayout()
@@ -36,11 +53,20 @@ class BMViewer(QWidget):
         controls.addWidget(QLabel("Масштаб (%)"))
         controls.addWidget(self.scale_slider)
 
+        self.memory_label = QLabel()
+
         layout = QVBoxLayout(self)
         layout.addLayout(controls)
         layout.addWidget(self.image_label)
+        layout.addWidget(self.memory_label)
 
-        self.original_image = None
+        self.original = None
+        self.scaled = None
+        self.update_memory_label()
+
+    @property
+    def original_image(self):
+        return self.original.image() if self.original is not None else None
 
     def load_image(self):
         fname, _ = QFileDialog.getOpenFileName(
@@ -48,29 +74,62 @@ class BMViewer(QWidget):
         )
         if not fname:
             return
-        self.original_image = QImage(fname)
+        image = QImage(fname)
+        if image.isNull():
+            return
+        for handle in (self.original, self.scaled):
+            if handle is not None:
+                handle.release()
+        self.scaled = None
+        self.original = default_store.put(image)
         self.update_scaled_image()
 
+    def on_scale_changed(self):
+        if self.mode_combo.currentText() != MODES[2]:
+            self.update_scaled_image()
+            return
+        self.show_scaled(MODES[1])
+        if not self.scale_slider.isSliderDown():
+            # клавиши и колесо: досчитываем сплайн, когда изменения прекратятся
+            self.spline_timer.start()
+
     def update_scaled_image(self):
-        if self.original_image is None:
+        self.spline_timer.stop()
+        self.show_scaled(self.mode_combo.currentText())
+
+    def show_scaled(self, mode):
+        if self.original is None:
             return
+        original = self.original_image
         factor = self.scale_slider.value() / 100.0
-        w = max(1, int(self.original_image.width() * factor))
-        h = max(1, int(self.original_image.height() * factor))
+        w = max(1, int(original.width() * factor))
+        h = max(1, int(original.height() * factor))
 
-        mode = self.mode_combo.currentText()
-        if mode == "По соседним":
-            transform_mode = Qt.FastTransformation  
-            image_scaled = self.original_image.scaled(w, h, Qt.IgnoreAspectRatio, transform_mode)
-        elif mode == "Линейная интерполяция":
-            image_scaled = self.original_image.scaled(w, h, Qt.IgnoreAspectRatio, Qt.SmoothTransformation)
-        else:
-            image_scaled = self.original_image.scaled(w, h, Qt.IgnoreAspectRatio, Qt.SmoothTransformation)
+        # показанная копия держится до следующего масштабирования, как
+        # RasterResource._scaled, и учитывается в памяти растров
+        scaled = default_store.derive(self.original, ('scaled', w, h, mode),
+                                      lambda img: scale_image(img, w, h, mode))
+        if self.scaled is not None:
+            self.scaled.release()
+        self.scaled = scaled
+        self.image_label.setPixmap(QPixmap.fromImage(scaled.image()))
+        self.update_memory_label()
 
-        self.image_label.setPixmap(QPixmap.fromImage(image_scaled))
+    def update_memory_label(self):
+        used = memory_usage() / 2**20
+        budget = default_store.budget / 2**20
+        self.memory_label.setText(f"Память растров: {used:.1f} / {budget:.0f} МБ")
 
-if __name__ == "__main__":
+def create_window():
+    return BMViewer()
+
+
+def main():
     app = QApplication(sys.argv)
-    viewer = BMViewer()
+    viewer = create_window()
     viewer.show()
-    sys.exit(app.exec_())
+    sys.exit(app.exec())
+
+
+if __name__ == "__main__":
+    main()
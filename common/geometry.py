@@ -0,0 +1,81 @@
+"""Геометрия без Qt: точки — кортежи (x, y).
+
+Здесь собраны вычисления, которые раньше повторялись в лабораторных:
+контрольные точки составного сплайна Безье, поворот/перенос полигона,
+поиск ближайшей точки и вписывание размера с сохранением пропорций.
+"""
+import math
+
+
+def spline_controls(points):
+    """Пары контрольных точек (C1, C2) для каждого отрезка C1-сплайна.
+
+    Касательные во внутренних точках — (P[i+1] - P[i-1]) / 2, на концах —
+    разность соседних точек; C1 = P[i] + T[i] / 3, C2 = P[i+1] - T[i+1] / 3.
+    """
+    n = len(points)
+    if n < 2:
+        return []
+    xs = [p[0] for p in points]
+    ys = [p[1] for p in points]
+    tx = [0.0] * n
+    ty = [0.0] * n
+    tx[0] = xs[1] - xs[0]
+    ty[0] = ys[1] - ys[0]
+    tx[n - 1] = xs[n - 1] - xs[n - 2]
+    ty[n - 1] = ys[n - 1] - ys[n - 2]
+    for i in range(1, n - 1):
+        tx[i] = (xs[i + 1] - xs[i - 1]) * 0.5
+        ty[i] = (ys[i + 1] - ys[i - 1]) * 0.5
+    third = 1.0 / 3.0
+    return [((xs[i] + tx[i] * third, ys[i] + ty[i] * third),
+             (xs[i + 1] - tx[i + 1] * third, ys[i + 1] - ty[i + 1] * third))
+            for i in range(n - 1)]
+
+
+def rotate_translate(points, pivot, angle=0, dx=0, dy=0):
+    """Поворот на angle градусов вокруг pivot и затем сдвиг на (dx, dy)"""
+    a = math.radians(angle)
+    c = math.cos(a)
+    s = math.sin(a)
+    px, py = pivot
+    result = []
+    for x, y in points:
+        rx = x - px
+        ry = y - py
+        result.append((px + rx * c - ry * s + dx, py + rx * s + ry * c + dy))
+    return result
+
+
+def nearest_point_index(points, pos):
+    """Индекс ближайшей точки по манхэттенскому расстоянию или None"""
+    qx, qy = pos
+    best_i = None
+    best_d = None
+    for i, (x, y) in enumerate(points):
+        d = abs(x - qx) + abs(y - qy)
+        if best_d is None or d < best_d:
+            best_d = d
+            best_i = i
+    return best_i
+
+
+def hit_point_index(points, pos, radius):
+    """Индекс ближайшей точки, если она ближе radius, иначе None"""
+    i = nearest_point_index(points, pos)
+    if i is None:
+        return None
+    x, y = points[i]
+    if abs(x - pos[0]) + abs(y - pos[1]) < radius:
+        return i
+    return None
+
+
+def fit_size(src_w, src_h, w, h, keep_aspect=True):
+    """Размер, в который масштабируется (src_w, src_h) для рамки (w, h), как в QSize.scaled"""
+    if not keep_aspect or src_w == 0 or src_h == 0:
+        return w, h
+    rw = h * src_w // src_h
+    if rw <= w:
+        return max(1, rw), h
+    return w, max(1, w * src_h // src_w)
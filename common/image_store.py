@@ -0,0 +1,196 @@
+"""Общее хранилище растров со счётчиком ссылок.
+
+Одинаковые изображения (по содержимому) хранятся один раз, производные
+(например, масштабированные) копии ищутся по исходнику и тегу и
+переиспользуются, пока на них есть ссылки. Изображение удаляется, как только освобождена последняя ссылка.
+Если суммарный объём превышает бюджет, давно не использованные
+изображения выгружаются на диск и подгружаются обратно при обращении.
+"""
+import itertools
+import os
+import threading
+from array import array
+from collections import OrderedDict
+
+from .qt import enum_value
+from .qt.QtGui import QImage
+
+DEFAULT_BUDGET = 512 * 2**20
+
+
+def image_buffer(image):
+    """Буфер пикселей QImage без копирования (живёт, пока жив image)"""
+    ptr = image.constBits()
+    ptr.setsize(image.sizeInBytes())
+    return ptr
+
+
+def image_digest(image):
+    """Хеш пикселей без выравнивания строк вместе с палитрой"""
+    import hashlib
+    h = hashlib.blake2b(digest_size=16)
+    data = image_buffer(image)
+    row = (image.width() * image.depth() + 7) // 8
+    bpl = image.bytesPerLine()
+    if row == bpl:
+        h.update(data)
+    else:
+        # байты выравнивания в конце строки не инициализированы
+        view = memoryview(data)
+        for y in range(image.height()):
+            h.update(view[y * bpl:y * bpl + row])
+    table = image.colorTable()
+    if table:
+        h.update(array('I', table).tobytes())
+    return h.hexdigest()
+
+
+class _Entry:
+    def __init__(self, key, image):
+        self.key = key
+        self.image = image
+        self.size = image.sizeInBytes()
+        self.refs = 0
+        self.spill_path = None
+        self.shape = (image.width(), image.height(), image.bytesPerLine(), enum_value(image.format()))
+        self.color_table = image.colorTable()
+
+
+class ImageHandle:
+    """Ссылка на изображение в хранилище; освобождается через release()"""
+
+    def __init__(self, store, key):
+        self.store = store
+        self.key = key
+        self.released = False
+
+    def image(self):
+        return self.store.image(self.key)
+
+    def release(self):
+        if not self.released:
+            self.released = True
+            self.store.release(self.key)
+
+
+class ImageStore:
+    def __init__(self, budget=DEFAULT_BUDGET, spill_dir=None):
+        self.budget = budget
+        self.spill_dir = spill_dir
+        self._tmp_dir = None
+        self.entries = OrderedDict()  # порядок — от давно использованных к недавним
+        self.lock = threading.RLock()
+        self._spill_ids = itertools.count()
+
+    def put(self, image):
+        """Кладёт QImage в хранилище и возвращает новую ссылку на него"""
+        key = (image.width(), image.height(), enum_value(image.format()), image_digest(image))
+        return self._insert(key, image)
+
+    def derive(self, handle, tag, factory):
+        """Ссылка на производное изображение factory(исходник), кешируется по tag.
+
+        Производное изображение не хешируется: его ключ — исходник и tag.
+        """
+        key = ('derived', handle.key, tag)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                return self._acquire(entry)
+        return self._insert(key, factory(handle.image()))
+
+    def _insert(self, key, image):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                entry = _Entry(key, image)
+                self.entries[key] = entry
+            return self._acquire(entry)
+
+    def image(self, key):
+        with self.lock:
+            entry = self.entries[key]
+            self.entries.move_to_end(key)
+            if entry.image is None:
+                self._unspill(entry)
+                self._enforce_budget(keep=entry)
+            return entry.image
+
+    def release(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                entry.refs -= 1
+                if entry.refs <= 0:
+                    self._drop(entry)
+
+    def memory_usage(self):
+        """Байт растров в памяти (без выгруженных на диск)"""
+        with self.lock:
+            return sum(e.size for e in self.entries.values() if e.image is not None)
+
+    def clear(self):
+        with self.lock:
+            for entry in self.entries.values():
+                self._remove_spill(entry)
+            self.entries.clear()
+            if self._tmp_dir is not None:
+                self._tmp_dir.cleanup()
+                self._tmp_dir = None
+                self.spill_dir = None
+
+    def _acquire(self, entry):
+        entry.refs += 1
+        self.entries.move_to_end(entry.key)
+        self._enforce_budget(keep=entry)
+        return ImageHandle(self, entry.key)
+
+    def _enforce_budget(self, keep=None):
+        used = self.memory_usage()
+        if used <= self.budget:
+            return
+        for entry in list(self.entries.values()):
+            if used <= self.budget:
+                return
+            if entry.image is not None and entry is not keep:
+                self._spill(entry)
+                used -= entry.size
+
+    def _drop(self, entry):
+        del self.entries[entry.key]
+        self._remove_spill(entry)
+
+    def _remove_spill(self, entry):
+        if entry.spill_path is not None:
+            os.remove(entry.spill_path)
+            entry.spill_path = None
+
+    def _spill(self, entry):
+        if self.spill_dir is None:
+            import tempfile
+            # TemporaryDirectory удаляет себя и при выходе из программы
+            self._tmp_dir = tempfile.TemporaryDirectory(prefix='raster_spill_')
+            self.spill_dir = self._tmp_dir.name
+        # у записей с одинаковыми байтами может быть разная форма,
+        # поэтому у каждой выгрузки свой файл
+        entry.spill_path = os.path.join(self.spill_dir, f'{next(self._spill_ids)}.raw')
+        with open(entry.spill_path, 'wb') as f:
+            f.write(image_buffer(entry.image))
+        entry.image = None
+
+    def _unspill(self, entry):
+        w, h, bpl, fmt = entry.shape
+        with open(entry.spill_path, 'rb') as f:
+            data = f.read()
+        image = QImage(data, w, h, bpl, QImage.Format(fmt)).copy()
+        if entry.color_table:
+            image.setColorTable(entry.color_table)
+        entry.image = image
+        self._remove_spill(entry)
+
+
+default_store = ImageStore()
+
+
+def memory_usage():
+    return default_store.memory_usage()
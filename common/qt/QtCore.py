@@ -0,0 +1,6 @@
+from . import PYQT6
+
+if PYQT6:
+    from PyQt6.QtCore import *  # noqa: F401,F403
+else:
+    from PyQt5.QtCore import *  # noqa: F401,F403
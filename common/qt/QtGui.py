@@ -0,0 +1,8 @@
+from . import PYQT6
+
+if PYQT6:
+    from PyQt6.QtGui import *  # noqa: F401,F403
+else:
+    from PyQt5.QtGui import *  # noqa: F401,F403
+    # в Qt6 QAction переехал из QtWidgets в QtGui
+    from PyQt5.QtWidgets import QAction  # noqa: F401
@@ -0,0 +1,75 @@
+"""Тонкая прослойка над PyQt5 и PyQt6.
+
+Привязка выбирается переменной окружения QT_API ("PyQt5" или "PyQt6"),
+иначе берётся уже импортированная, иначе первая установленная. Модули
+common.qt.QtCore / QtGui / QtWidgets импортируются вместо PyQt5.* / PyQt6.*.
+
+В PyQt6 значения перечислений доступны только через имя перечисления
+(Qt.PenStyle.DashLine). Чтобы один и тот же код работал в обеих
+привязках, они дублируются в классе-владельце (Qt.DashLine), как в PyQt5.
+"""
+import enum
+import importlib
+import os
+import sys
+
+APIS = ('PyQt5', 'PyQt6')
+
+
+def _choose_api():
+    api = os.environ.get('QT_API')
+    if api:
+        if api not in APIS:
+            raise ImportError(f'QT_API must be one of {APIS}, got {api!r}')
+        return api
+    for name in APIS:
+        if name in sys.modules:
+            return name
+    for name in APIS:
+        try:
+            importlib.import_module(name)
+            return name
+        except ImportError:
+            continue
+    raise ImportError('PyQt5 or PyQt6 is required')
+
+
+# Классы, перечисления которых поднимаются на уровень класса в PyQt6.
+# PyQt6 создаёт перечисления лениво, и обход всех классов модуля стоит
+# около 100 мс при запуске, поэтому список ограничен тем, что используется.
+PROMOTED = {
+    'QtCore': ('Qt', 'QEvent'),
+    'QtGui': ('QImage', 'QPainter'),
+    'QtWidgets': (),
+}
+
+
+def _promote_enums(klass):
+    for value in list(vars(klass).values()):
+        if isinstance(value, enum.EnumMeta):
+            # __members__ включает и составные значения флагов (AlignCenter)
+            for name, member in value.__members__.items():
+                if name not in klass.__dict__:
+                    setattr(klass, name, member)
+
+
+API = _choose_api()
+PYQT6 = API == 'PyQt6'
+
+if PYQT6:
+    for _module, _classes in PROMOTED.items():
+        _module = importlib.import_module('PyQt6.' + _module)
+        for _class in _classes:
+            _promote_enums(getattr(_module, _class))
+
+
+def event_pos(event):
+    """Позиция мыши как QPointF (в PyQt6 нет QMouseEvent.pos())"""
+    if PYQT6:
+        return event.position()
+    return event.localPos()
+
+
+def enum_value(value):
+    """Целое значение перечисления (в PyQt6 перечисления — не int)"""
+    return int(getattr(value, 'value', value))
@@ -0,0 +1,114 @@
+"""Масштабирование растров: режимы BMViewer и RasterResource.
+
+"По соседним" и "Линейная интерполяция" выполняет сам Qt
+(FastTransformation / SmoothTransformation). Сплайновый режим — сепарабельная
+бикубическая свёртка (Catmull-Rom) на NumPy; для оценки качества есть
+эталонный Lanczos-3 в двойной точности.
+"""
+from .geometry import fit_size
+from .qt.QtCore import Qt
+from .qt.QtGui import QImage
+
+MODES = ["По соседним", "Линейная интерполяция", "Сплайновая интерполяция"]
+
+
+def _cubic(x, np):
+    # Catmull-Rom (a = -0.5)
+    x = np.abs(x)
+    x2 = x * x
+    x3 = x2 * x
+    return np.where(x <= 1, 1.5 * x3 - 2.5 * x2 + 1,
+                    np.where(x < 2, -0.5 * x3 + 2.5 * x2 - 4 * x + 2, 0.0))
+
+
+def _lanczos3(x, np):
+    return np.where(np.abs(x) < 3, np.sinc(x) * np.sinc(x / 3.0), 0.0)
+
+
+KERNELS = {
+    'cubic': (_cubic, 2),
+    'lanczos3': (_lanczos3, 3),
+}
+
+
+def _weights(src_size, dst_size, kernel, support, np):
+    scale = dst_size / src_size
+    # при уменьшении ядро растягивается, чтобы не было алиасинга
+    stretch = max(1.0, 1.0 / scale)
+    centers = (np.arange(dst_size) + 0.5) / scale - 0.5
+    radius = support * stretch
+    left = np.floor(centers - radius).astype(np.int64) + 1
+    taps = int(np.ceil(2 * radius)) + 1
+    idx = left[:, None] + np.arange(taps)[None, :]
+    wts = kernel((idx - centers[:, None]) / stretch, np)
+    wts /= wts.sum(axis=1, keepdims=True)
+    return np.clip(idx, 0, src_size - 1), wts
+
+
+def _resample_rows(src, idx, wts, dtype, band, np):
+    """Свёртка по первой оси; временные массивы не больше полосы из band строк"""
+    out = np.empty((idx.shape[0],) + src.shape[1:], dtype=dtype)
+    for r0 in range(0, idx.shape[0], band):
+        r1 = min(idx.shape[0], r0 + band)
+        acc = out[r0:r1]
+        acc.fill(0)
+        for t in range(idx.shape[1]):
+            acc += wts[r0:r1, t, None, None] * src[idx[r0:r1, t]]
+    return out
+
+
+def resample_array(arr, w, h, kernel='cubic', dtype=None, band=64):
+    """Сепарабельное масштабирование массива (h, w, c) до размера (h, w)"""
+    import numpy as np
+    func, support = KERNELS[kernel]
+    dtype = dtype or np.float32
+
+    idx, wts = _weights(arr.shape[0], h, func, support, np)
+    rows = _resample_rows(arr, idx, wts.astype(dtype), dtype, band, np)
+
+    # второй проход — по столбцам: транспонируем, чтобы снова идти по строкам
+    idx, wts = _weights(arr.shape[1], w, func, support, np)
+    cols = _resample_rows(rows.swapaxes(0, 1), idx, wts.astype(dtype), dtype, band, np)
+    return cols.swapaxes(0, 1)
+
+
+def image_to_array(image):
+    """Копия QImage в массив (h, w, 4) uint8, каналы B, G, R, A"""
+    import numpy as np
+    image = image.convertToFormat(QImage.Format_ARGB32)
+    ptr = image.constBits()
+    ptr.setsize(image.sizeInBytes())
+    arr = np.frombuffer(ptr, np.uint8).reshape(image.height(), image.bytesPerLine())
+    return arr[:, :image.width() * 4].reshape(image.height(), image.width(), 4).copy()
+
+
+def array_to_image(arr, inplace=False):
+    """QImage из массива (h, w, 4); inplace=True разрешает портить arr вместо копии"""
+    import numpy as np
+    if inplace:
+        arr += 0.5
+        np.clip(arr, 0, 255, out=arr)
+    else:
+        arr = np.clip(arr + 0.5, 0, 255)
+    arr = np.ascontiguousarray(arr.astype(np.uint8))
+    h, w = arr.shape[:2]
+    return QImage(arr.data, w, h, w * 4, QImage.Format_ARGB32).copy()
+
+
+def scale_image(image, w, h, mode, keep_aspect=False):
+    """Масштабирует QImage в одном из режимов MODES"""
+    if keep_aspect:
+        w, h = fit_size(image.width(), image.height(), w, h)
+    if mode == MODES[0]:
+        return image.scaled(w, h, Qt.IgnoreAspectRatio, Qt.FastTransformation)
+    if mode == MODES[1]:
+        return image.scaled(w, h, Qt.IgnoreAspectRatio, Qt.SmoothTransformation)
+    if mode == MODES[2]:
+        return array_to_image(resample_array(image_to_array(image), w, h, 'cubic'), inplace=True)
+    raise ValueError(f'unknown mode: {mode}')
+
+
+def reference_image(image, w, h):
+    """Эталон для сравнения качества: Lanczos-3 в float64"""
+    import numpy as np
+    return resample_array(image_to_array(image), w, h, 'lanczos3', np.float64)
@@ -0,0 +1,32 @@
+"""Составной сплайн Безье (C1) для QPainter, общий для всех лабораторных."""
+from .geometry import hit_point_index, spline_controls
+from .qt.QtCore import QPointF
+from .qt.QtGui import QPainterPath
+
+
+def as_tuples(points):
+    return [(p.x(), p.y()) for p in points]
+
+
+def build_composite_bezier(points):
+    """QPainterPath через points и пары контрольных точек (QPointF, QPointF).
+
+    Для меньше чем двух точек возвращает (None, None).
+    """
+    if len(points) < 2:
+        return None, None
+    pts = as_tuples(points)
+    controls = spline_controls(pts)
+    path = QPainterPath(QPointF(*pts[0]))
+    control_pairs = []
+    for (c1, c2), p in zip(controls, pts[1:]):
+        C1 = QPointF(*c1)
+        C2 = QPointF(*c2)
+        path.cubicTo(C1, C2, QPointF(*p))
+        control_pairs.append((C1, C2))
+    return path, control_pairs
+
+
+def hit_point(points, pos, radius):
+    """Индекс точки из списка QPointF под курсором pos или None"""
+    return hit_point_index(as_tuples(points), (pos.x(), pos.y()), radius)
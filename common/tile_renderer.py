@@ -0,0 +1,118 @@
+"""Бэкенды отрисовки для виджетов-рисовалок.
+
+Виджет в paintEvent снимает своё состояние в объект scene, а функция
+draw(painter, scene, rect) рисует по нему в координатах виджета только то,
+что пересекает rect (QRectF). QPainterBackend вызывает её один раз для всего
+виджета, а TiledBackend делит холст на плитки, рисует каждую в свой QImage
+в пуле потоков и затем одним проходом переносит плитки на виджет.
+
+draw выполняется вне GUI-потока, поэтому обращаться к виджету в ней нельзя,
+только к scene. Плитки не очищаются заранее: draw должна сама залить rect.
+Плитки создаются с devicePixelRatio виджета, который paintEvent передаёт
+в render, иначе на HiDPI-экранах изображение будет размытым. QPixmap тоже нельзя: вне GUI-потока допустимы только QImage
+(drawImage, QBrush(QImage)).
+"""
+import os
+import time
+
+from .qt.QtCore import Qt, QPoint, QRect, QRectF
+from .qt.QtGui import QColor, QImage, QPainter
+
+
+class QPainterBackend:
+    """Обычная отрисовка одним QPainter в GUI-потоке"""
+    name = 'QPainter'
+
+    def __init__(self):
+        self.last_ms = None
+
+    def render(self, painter, size, draw, scene, dpr=1.0):
+        start = time.perf_counter()
+        draw(painter, scene, QRectF(QRect(QPoint(0, 0), size)))
+        self.last_ms = (time.perf_counter() - start) * 1000.0
+
+
+class TiledBackend:
+    """Программная отрисовка плитками в пуле потоков"""
+    name = 'Плитки'
+
+    def __init__(self, tile_size=256, workers=None):
+        self.tile_size = tile_size
+        self.workers = workers or os.cpu_count() or 1
+        self._pool = None
+        self.last_ms = None
+
+    @property
+    def pool(self):
+        # потоки создаются только когда бэкенд выбран впервые
+        if self._pool is None:
+            from concurrent.futures import ThreadPoolExecutor
+            self._pool = ThreadPoolExecutor(max_workers=self.workers)
+        return self._pool
+
+    def tiles(self, size):
+        t = self.tile_size
+        return [QRect(x, y, min(t, size.width() - x), min(t, size.height() - y))
+                for y in range(0, size.height(), t)
+                for x in range(0, size.width(), t)]
+
+    def render_tile(self, rect, draw, scene, dpr=1.0):
+        image = QImage(round(rect.width() * dpr), round(rect.height() * dpr),
+                       QImage.Format_ARGB32_Premultiplied)
+        image.setDevicePixelRatio(dpr)
+        p = QPainter(image)
+        p.translate(-rect.x(), -rect.y())
+        p.setClipRect(rect)
+        draw(p, scene, QRectF(rect))
+        p.end()
+        return image
+
+    def render(self, painter, size, draw, scene, dpr=1.0):
+        start = time.perf_counter()
+        rects = self.tiles(size)
+        images = list(self.pool.map(lambda r: self.render_tile(r, draw, scene, dpr), rects))
+        for rect, image in zip(rects, images):
+            painter.drawImage(rect.topLeft(), image)
+        self.last_ms = (time.perf_counter() - start) * 1000.0
+
+
+def intersects(rect, bounds):
+    """Пересекает ли bounds (QRectF или None) область rect"""
+    return bounds is not None and rect.intersects(bounds)
+
+
+def path_bounds(path, margin=0.0, transform=None):
+    """Границы QPainterPath (после transform), расширенные на толщину пера margin"""
+    bounds = path.boundingRect()
+    if transform is not None:
+        bounds = transform.mapRect(bounds)
+    return bounds.adjusted(-margin, -margin, margin, margin)
+
+
+def points_bounds(points, margin=0.0):
+    """Охватывающий прямоугольник точек (QPointF), расширенный на margin, или None"""
+    if not points:
+        return None
+    xs = [p.x() for p in points]
+    ys = [p.y() for p in points]
+    return QRectF(min(xs) - margin, min(ys) - margin,
+                  max(xs) - min(xs) + 2 * margin, max(ys) - min(ys) + 2 * margin)
+
+
+def make_backends():
+    return [QPainterBackend(), TiledBackend()]
+
+
+def draw_frame_times(painter, backends, current):
+    """Подпись с временем кадра каждого бэкенда в правом нижнем углу"""
+    parts = []
+    for backend in backends:
+        ms = '—' if backend.last_ms is None else f'{backend.last_ms:.1f} мс'
+        mark = '*' if backend is current else ''
+        parts.append(f'{mark}{backend.name}: {ms}')
+    text = ' | '.join(parts)
+    painter.save()
+    painter.setPen(QColor(80, 80, 80))
+    rect = painter.viewport().adjusted(0, 0, -8, -6)
+    painter.drawText(rect, Qt.AlignRight | Qt.AlignBottom, text)
+    painter.restore()
@@ -0,0 +1,146 @@
+"""Единая точка запуска лабораторных работ.
+
+    python launcher.py lab4                 # запустить лабораторную
+    python launcher.py lab4 --profile       # + время этапов запуска
+    python launcher.py lab4 --bench 5       # время до первой отрисовки (медиана)
+
+Импортируется только выбранная лабораторная и одна привязка Qt: по умолчанию
+та, под которую лабораторная писалась (Lab1–2 — PyQt6, Lab3–5 — PyQt5),
+или заданная через --qt.
+"""
+import argparse
+import importlib
+import json
+import os
+import sys
+import time
+
+T0 = time.perf_counter()
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# имя: (каталог, модуль с create_window, привязка Qt по умолчанию)
+LABS = {
+    'lab1': ('Lab1', 'main', 'PyQt6'),
+    'lab2': ('Lab2', 'main', 'PyQt6'),
+    'lab3': ('Lab3', 'lab3', 'PyQt5'),
+    'lab4': ('Lab4', 'lab4', 'PyQt5'),
+    'lab5': ('Lab5', 'lab5', 'PyQt5'),
+}
+
+
+class StartupProfile:
+    """Отметки времени этапов запуска, в мс от запуска launcher"""
+
+    def __init__(self):
+        self.marks = []
+
+    def mark(self, name):
+        self.marks.append((name, (time.perf_counter() - T0) * 1000.0))
+
+    def report(self):
+        prev = 0.0
+        for name, ms in self.marks:
+            print(f'{name:>22}: {ms:8.1f} мс  (+{ms - prev:.1f})')
+            prev = ms
+
+    def as_dict(self):
+        return dict(self.marks)
+
+
+def run_lab(name, profile, on_first_paint=None, quit_after_paint=False, binding=None):
+    directory, module_name, default_binding = LABS[name]
+    os.environ['QT_API'] = binding or default_binding
+    sys.path.insert(0, os.path.join(HERE, directory))
+
+    from common.qt import QtCore as core, QtWidgets as widgets
+    profile.mark('import Qt')
+
+    app = widgets.QApplication(sys.argv[:1])
+    profile.mark('QApplication')
+
+    module = importlib.import_module(module_name)
+    profile.mark(f'import {module_name}')
+
+    window = module.create_window()
+    profile.mark('create_window')
+
+    class FirstPaint(core.QObject):
+        def eventFilter(self, obj, event):
+            if event.type() == core.QEvent.Paint:
+                window.removeEventFilter(self)
+                # отметка ставится после того, как paintEvent отработает
+                core.QTimer.singleShot(0, on_painted)
+            return False
+
+    def on_painted():
+        profile.mark('first paint')
+        if on_first_paint is not None:
+            on_first_paint()
+        if quit_after_paint:
+            app.quit()
+
+    first_paint = FirstPaint()
+    window.installEventFilter(first_paint)
+    window.show()
+    profile.mark('show')
+    return app.exec()
+
+
+def bench(name, runs, csv_file=None, binding=None):
+    """Запускает лабораторную runs раз без окна и собирает время до первой отрисовки"""
+    import csv
+    import statistics
+    import subprocess
+
+    env = dict(os.environ, QT_QPA_PLATFORM='offscreen')
+    cmd = [sys.executable, os.path.abspath(__file__), name, '--quit-after-paint', '--json']
+    if binding:
+        cmd += ['--qt', binding]
+    results = []
+    for _ in range(runs):
+        out = subprocess.run(cmd, env=env, capture_output=True, text=True, check=True).stdout
+        results.append(json.loads(out.strip().splitlines()[-1]))
+
+    stages = list(results[0].keys())
+    medians = {s: statistics.median(r[s] for r in results) for s in stages}
+    for stage in stages:
+        print(f'{stage:>22}: {medians[stage]:8.1f} мс')
+    if csv_file:
+        new = not os.path.exists(csv_file)
+        with open(csv_file, 'a', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            if new:
+                writer.writerow(['timestamp', 'lab', 'qt', 'runs', 'first_paint_ms'])
+            writer.writerow([time.strftime('%Y-%m-%dT%H:%M:%S'), name,
+                             binding or LABS[name][2], runs, round(medians['first paint'], 1)])
+    return medians
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Запуск лабораторных работ')
+    parser.add_argument('lab', choices=sorted(LABS))
+    parser.add_argument('--qt', choices=('PyQt5', 'PyQt6'), help='привязка Qt')
+    parser.add_argument('--profile', action='store_true', help='вывести время этапов запуска')
+    parser.add_argument('--bench', type=int, metavar='N',
+                        help='измерить время до первой отрисовки по N запускам')
+    parser.add_argument('--bench-csv', default=None, help='дописать медиану в CSV')
+    parser.add_argument('--quit-after-paint', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--json', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.bench:
+        bench(args.lab, args.bench, args.bench_csv, args.qt)
+        return 0
+
+    profile = StartupProfile()
+    report = None
+    if args.json:
+        report = lambda: print(json.dumps(profile.as_dict()), flush=True)
+    elif args.profile:
+        report = profile.report
+    return run_lab(args.lab, profile, report, args.quit_after_paint, args.qt)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,10 @@
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+for path in (ROOT, os.path.join(ROOT, 'Lab4')):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
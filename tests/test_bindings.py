@@ -0,0 +1,26 @@
+"""Прогон Qt-зависимых тестов под каждой привязкой в отдельном процессе.
+
+PyQt5 и PyQt6 нельзя импортировать в один процесс, поэтому файлы из
+QT_TESTS запускаются заново с нужным QT_API.
+"""
+import importlib.util
+import os
+import subprocess
+import sys
+
+import pytest
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+QT_TESTS = ('test_qt_modules.py', 'test_image_store.py', 'test_image_ops_qt.py')
+
+
+@pytest.mark.parametrize('api', ['PyQt5', 'PyQt6'])
+def test_qt_modules_under_binding(api):
+    if importlib.util.find_spec(api) is None:
+        pytest.skip(f'{api} is not installed')
+    env = dict(os.environ, QT_API=api, QT_QPA_PLATFORM='offscreen')
+    cmd = [sys.executable, '-m', 'pytest', '-q', '-p', 'no:cacheprovider']
+    cmd += [os.path.join(HERE, name) for name in QT_TESTS]
+    result = subprocess.run(cmd, env=env, capture_output=True, text=True)
+    assert result.returncode == 0, result.stdout + result.stderr
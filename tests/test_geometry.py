@@ -0,0 +1,76 @@
+import math
+
+import pytest
+
+from common.geometry import (fit_size, hit_point_index, nearest_point_index,
+                             rotate_translate, spline_controls)
+
+
+def close(a, b, tol=1e-9):
+    return all(abs(x - y) <= tol for x, y in zip(a, b))
+
+
+@pytest.mark.parametrize('points', [[], [(1, 2)]])
+def test_spline_controls_needs_two_points(points):
+    assert spline_controls(points) == []
+
+
+def test_spline_controls_segment_thirds():
+    (c1, c2), = spline_controls([(0, 0), (3, 6)])
+    assert close(c1, (1, 2))
+    assert close(c2, (2, 4))
+
+
+def test_spline_controls_are_c1_continuous():
+    pts = [(0, 0), (10, 5), (20, -5), (35, 0), (40, 10)]
+    pairs = spline_controls(pts)
+    assert len(pairs) == len(pts) - 1
+    for i in range(len(pairs) - 1):
+        p = pts[i + 1]
+        incoming = (p[0] - pairs[i][1][0], p[1] - pairs[i][1][1])
+        outgoing = (pairs[i + 1][0][0] - p[0], pairs[i + 1][0][1] - p[1])
+        assert close(incoming, outgoing)
+
+
+def test_rotate_translate_quarter_turn():
+    result = rotate_translate([(2, 1), (1, 1)], pivot=(1, 1), angle=90, dx=10, dy=-1)
+    assert close(result[0], (11, 1))
+    assert close(result[1], (11, 0))
+
+
+def test_rotate_translate_full_turn_is_identity():
+    pts = [(3.5, -2), (0, 7)]
+    for p, q in zip(rotate_translate(pts, (1, 1), 360), pts):
+        assert close(p, q)
+
+
+def test_nearest_point_index_uses_manhattan_distance():
+    pts = [(3, 3), (0, 5)]
+    # по евклиду ближе (3, 3), по манхэттену — (0, 5)
+    assert nearest_point_index(pts, (0, 0)) == 1
+    assert nearest_point_index([], (0, 0)) is None
+
+
+def test_hit_point_index_radius():
+    pts = [(10, 10), (50, 50)]
+    assert hit_point_index(pts, (13, 14), 10) == 0
+    assert hit_point_index(pts, (20, 10), 10) is None
+    assert hit_point_index([], (0, 0), 10) is None
+
+
+@pytest.mark.parametrize('src, box, keep, expected', [
+    ((200, 100), (100, 100), True, (100, 50)),
+    ((100, 200), (100, 100), True, (50, 100)),
+    ((200, 100), (400, 100), True, (200, 100)),
+    ((200, 100), (100, 100), False, (100, 100)),
+    ((1000, 1), (10, 10), True, (10, 1)),
+    ((0, 10), (30, 40), True, (30, 40)),
+])
+def test_fit_size(src, box, keep, expected):
+    assert fit_size(*src, *box, keep_aspect=keep) == expected
+
+
+def test_fit_size_keeps_ratio():
+    w, h = fit_size(640, 480, 300, 300)
+    assert (w, h) == (300, 225)
+    assert math.isclose(w / h, 640 / 480)
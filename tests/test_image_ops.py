@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+
+from image_ops import ImagePipeline
+
+SEPIA = [[0.393, 0.769, 0.189],
+         [0.349, 0.686, 0.168],
+         [0.272, 0.534, 0.131]]
+SWAP = [[0, 0, 1], [0, 1, 0], [1, 0, 0]]
+
+
+def invert(p):
+    return p.color_matrix(-np.eye(3), (255, 255, 255))
+
+
+@pytest.fixture
+def arr():
+    rng = np.random.default_rng(0)
+    return rng.integers(0, 256, size=(70, 90, 4), dtype=np.uint8)
+
+
+def run_separately(arr, builders):
+    for build in builders:
+        arr = build(ImagePipeline(band_height=16)).run(arr)
+    return arr
+
+
+CHAINS = {
+    'gamma+threshold': [lambda p: p.gamma(2.2), lambda p: p.threshold()],
+    'sepia+sepia': [lambda p: p.color_matrix(SEPIA), lambda p: p.color_matrix(SEPIA)],
+    'swap+sepia': [lambda p: p.color_matrix(SWAP), lambda p: p.color_matrix(SEPIA)],
+    'invert+sepia': [invert, lambda p: p.color_matrix(SEPIA)],
+    'swap+invert': [lambda p: p.color_matrix(SWAP), invert],
+    'blur+blur': [lambda p: p.blur(), lambda p: p.blur()],
+    'sharpen+grayscale': [lambda p: p.sharpen(), lambda p: p.grayscale()],
+    'equalize+gamma': [lambda p: p.equalize(), lambda p: p.gamma(0.5)],
+}
+
+
+@pytest.mark.parametrize('chain', CHAINS.values(), ids=CHAINS.keys())
+def test_pipeline_matches_separate_runs(arr, chain):
+    pipeline = ImagePipeline(band_height=16)
+    for build in chain:
+        build(pipeline)
+    assert np.array_equal(pipeline.run(arr), run_separately(arr, chain))
+
+
+def test_plan_fuses_only_exact_operations():
+    p = ImagePipeline().gamma(2.2).gamma(0.5)
+    assert [kind for kind, _ in p.plan()] == ['lut']
+
+    p = ImagePipeline().color_matrix(SWAP)
+    invert(p)
+    assert [kind for kind, _ in p.plan()] == ['matrix']
+
+    p = ImagePipeline().color_matrix(SEPIA).color_matrix(SEPIA)
+    assert len(p.plan()) == 2
+
+    p = ImagePipeline().blur().blur()
+    assert len(p.plan()) == 2
+
+
+def test_alpha_is_preserved(arr):
+    out = ImagePipeline().grayscale().blur().run(arr)
+    assert np.array_equal(out[..., 3], arr[..., 3])
@@ -0,0 +1,50 @@
+"""QImage-часть image_ops: см. test_bindings.py о запуске под обеими привязками."""
+import gc
+
+import numpy as np
+import pytest
+
+pytest.importorskip('common.qt')
+
+from common.qt.QtGui import QBrush, QColor, QGuiApplication, QImage  # noqa: E402
+from image_ops import ImagePipeline, array_to_qimage, qimage_to_array  # noqa: E402
+
+
+@pytest.fixture(scope='module', autouse=True)
+def app():
+    return QGuiApplication.instance() or QGuiApplication([])
+
+
+def test_qimage_to_array_is_a_view():
+    image = QImage(5, 3, QImage.Format_ARGB32)
+    image.fill(QColor(10, 20, 30))
+    arr = qimage_to_array(image)
+    assert arr.shape == (3, 5, 4)
+    assert arr[0, 0].tolist() == [30, 20, 10, 255]
+    arr[1, 2] = (0, 0, 255, 255)
+    assert QColor(image.pixel(2, 1)) == QColor(255, 0, 0)
+
+
+def test_qimage_to_array_rejects_other_formats():
+    with pytest.raises(ValueError):
+        qimage_to_array(QImage(2, 2, QImage.Format_Grayscale8))
+
+
+def test_array_to_qimage_shares_memory():
+    arr = np.zeros((2, 3, 4), dtype=np.uint8)
+    image = array_to_qimage(arr)
+    image._array[0, 0] = (255, 0, 0, 255)
+    assert QColor(image.pixel(0, 0)) == QColor(0, 0, 255)
+
+
+def test_apply_qimage_returns_owning_image():
+    src = QImage(8, 6, QImage.Format_RGB32)
+    src.fill(QColor(200, 100, 50))
+    out = ImagePipeline().grayscale().apply_qimage(src)
+    assert not hasattr(out, '_array')
+    brush = QBrush(out)
+    del out
+    gc.collect()
+    # кисть держит неглубокую копию: пиксели должны остаться на месте
+    gray = round(200 * 0.299 + 100 * 0.587 + 50 * 0.114)
+    assert QColor(brush.textureImage().pixel(7, 5)) == QColor(gray, gray, gray)
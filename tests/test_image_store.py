@@ -0,0 +1,110 @@
+"""Хранилище растров: см. test_bindings.py о запуске под обеими привязками."""
+import os
+
+import pytest
+
+pytest.importorskip('common.qt')
+
+from common.image_store import ImageStore  # noqa: E402
+from common.qt.QtGui import QColor, QGuiApplication, QImage  # noqa: E402
+
+IMAGE_BYTES = 16 * 16 * 4
+
+
+@pytest.fixture(scope='module', autouse=True)
+def app():
+    return QGuiApplication.instance() or QGuiApplication([])
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ImageStore(spill_dir=str(tmp_path))
+    yield store
+    store.clear()
+
+
+def filled(color, w=16, h=16):
+    image = QImage(w, h, QImage.Format_ARGB32)
+    image.fill(QColor(color))
+    return image
+
+
+def indexed(palette):
+    image = QImage(4, 4, QImage.Format_Indexed8)
+    image.setColorTable(palette)
+    image.fill(0)
+    return image
+
+
+def test_put_deduplicates_equal_content(store):
+    a = store.put(filled('red'))
+    b = store.put(filled('red'))
+    c = store.put(filled('blue'))
+    assert a.key == b.key != c.key
+    assert len(store.entries) == 2
+    a.release()
+    assert len(store.entries) == 2
+    b.release()
+    assert len(store.entries) == 1
+
+
+def test_palette_is_part_of_the_key(store):
+    red = store.put(indexed([0xffff0000]))
+    blue = store.put(indexed([0xff0000ff]))
+    assert red.key != blue.key
+    assert blue.image().pixel(0, 0) == 0xff0000ff
+
+
+def test_derived_entry_is_cached_and_dropped_on_last_release(store):
+    calls = []
+
+    def half(image):
+        calls.append(1)
+        return image.scaled(8, 8)
+
+    src = store.put(filled('green'))
+    a = store.derive(src, 'half', half)
+    b = store.derive(src, 'half', half)
+    assert a.key == b.key and len(calls) == 1
+    assert a.image().width() == 8
+    a.release()
+    b.release()
+    assert a.key not in store.entries
+    assert src.key in store.entries
+
+
+def test_spill_round_trip_under_tiny_budget(store):
+    store.budget = IMAGE_BYTES
+    first = store.put(filled('red'))
+    second = store.put(filled('blue'))
+    assert store.memory_usage() == IMAGE_BYTES
+    assert len(os.listdir(store.spill_dir)) == 1
+
+    assert QColor(first.image().pixel(3, 3)) == QColor('red')
+    # загруженная обратно запись больше не держит файл, выгружена вторая
+    assert store.entries[first.key].spill_path is None
+    assert store.entries[second.key].image is None
+    assert QColor(second.image().pixel(3, 3)) == QColor('blue')
+
+    first.release()
+    second.release()
+    assert os.listdir(store.spill_dir) == []
+
+
+def test_spilled_palette_survives_round_trip(store):
+    store.budget = 0
+    handle = store.put(indexed([0xff00ff00]))
+    store.put(filled('red')).release()
+    assert handle.image().pixel(0, 0) == 0xff00ff00
+
+
+def test_same_bytes_different_shape_do_not_share_spill_file(store):
+    store.budget = 100 * 200 * 4
+    tall = store.put(filled('white', 100, 200))
+    wide = store.put(filled('white', 200, 100))
+    assert tall.key != wide.key
+    tall.image()  # выгружает wide
+    tall.release()
+    image = wide.image()
+    assert (image.width(), image.height()) == (200, 100)
+    assert QColor(image.pixel(199, 99)) == QColor('white')
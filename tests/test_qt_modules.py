@@ -0,0 +1,108 @@
+"""Части common, зависящие от Qt.
+
+Выполняются с привязкой, которую выбирает common.qt (QT_API или первая
+установленная); test_bindings.py запускает этот файл под каждой привязкой.
+"""
+import numpy as np
+import pytest
+
+qt = pytest.importorskip('common.qt')
+
+from common.qt.QtCore import QPointF, Qt  # noqa: E402
+from common.qt.QtGui import QColor, QGuiApplication, QImage  # noqa: E402
+from common.resample import (MODES, array_to_image, image_to_array,  # noqa: E402
+                             resample_array, scale_image)
+from common.spline import build_composite_bezier, hit_point  # noqa: E402
+
+
+@pytest.fixture(scope='module', autouse=True)
+def app():
+    return QGuiApplication.instance() or QGuiApplication([])
+
+
+def gradient_image(w=40, h=30):
+    arr = np.zeros((h, w, 4), dtype=np.uint8)
+    arr[..., 0] = np.linspace(0, 255, w)[None, :]
+    arr[..., 1] = np.linspace(0, 255, h)[:, None]
+    arr[..., 2] = 90
+    arr[..., 3] = 255
+    return array_to_image(arr), arr
+
+
+def test_enums_are_reachable_through_owner_class():
+    assert Qt.AlignCenter == Qt.AlignHCenter | Qt.AlignVCenter
+    assert qt.enum_value(QImage.Format_ARGB32) == 5
+    assert qt.API in qt.APIS
+
+
+def test_build_composite_bezier_needs_two_points():
+    assert build_composite_bezier([]) == (None, None)
+    assert build_composite_bezier([QPointF(1, 1)]) == (None, None)
+
+
+def test_build_composite_bezier_passes_through_points():
+    pts = [QPointF(0, 0), QPointF(50, 40), QPointF(100, 0), QPointF(150, 60)]
+    path, pairs = build_composite_bezier(pts)
+    assert len(pairs) == len(pts) - 1
+    assert path.elementCount() == 1 + 3 * (len(pts) - 1)
+    assert path.pointAtPercent(0) == pts[0]
+    assert path.pointAtPercent(1) == pts[-1]
+    assert pairs[0][0] == QPointF(50 / 3, 40 / 3)
+
+
+def test_hit_point():
+    pts = [QPointF(10, 10), QPointF(40, 40)]
+    assert hit_point(pts, QPointF(42, 38), 10) == 1
+    assert hit_point(pts, QPointF(25, 25), 10) is None
+
+
+def test_image_array_round_trip():
+    image, arr = gradient_image()
+    assert np.array_equal(image_to_array(image), arr)
+
+
+@pytest.mark.parametrize('mode', MODES)
+@pytest.mark.parametrize('size', [(80, 60), (13, 7), (40, 30)])
+def test_scale_image_size(mode, size):
+    image, _ = gradient_image()
+    result = scale_image(image, *size, mode)
+    assert (result.width(), result.height()) == size
+
+
+@pytest.mark.parametrize('mode', MODES)
+def test_scale_image_keep_aspect(mode):
+    image, _ = gradient_image(40, 30)
+    result = scale_image(image, 100, 100, mode, keep_aspect=True)
+    assert (result.width(), result.height()) == (100, 75)
+
+
+def test_scale_image_unknown_mode():
+    image, _ = gradient_image()
+    with pytest.raises(ValueError):
+        scale_image(image, 10, 10, 'bogus')
+
+
+def test_nearest_mode_duplicates_pixels():
+    image, arr = gradient_image(8, 6)
+    out = image_to_array(scale_image(image, 16, 12, MODES[0]))
+    assert np.array_equal(out[::2, ::2], arr)
+
+
+def test_spline_mode_keeps_flat_colour():
+    image = QImage(20, 20, QImage.Format_ARGB32)
+    image.fill(QColor(10, 200, 30))
+    out = image_to_array(scale_image(image, 57, 33, MODES[2]))
+    assert np.all(out == [30, 200, 10, 255])
+
+
+def test_resample_array_is_exact_at_same_size():
+    _, arr = gradient_image()
+    out = resample_array(arr.astype(np.float32), 40, 30)
+    assert np.allclose(out, arr, atol=1e-3)
+
+
+def test_resample_bands_do_not_change_result():
+    _, arr = gradient_image(31, 23)
+    a = resample_array(arr, 77, 51, band=5)
+    b = resample_array(arr, 77, 51, band=1000)
+    assert np.array_equal(a, b)
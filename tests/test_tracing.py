@@ -0,0 +1,105 @@
+import numpy as np
+import pytest
+
+from tracing import (join_segments, padded_band, simplify, simplify_closed,
+                     threshold_rows, trace_band, trace_mask)
+
+
+def signed_area(points):
+    pts = np.asarray(points, dtype=np.float64)
+    x, y = pts[:, 0], pts[:, 1]
+    return 0.5 * float(np.sum(x * np.roll(y, -1) - np.roll(x, -1) * y))
+
+
+def blobs(h=60, w=80, seed=0):
+    rng = np.random.default_rng(seed)
+    yy, xx = np.mgrid[:h, :w]
+    mask = np.zeros((h, w), dtype=np.uint8)
+    for _ in range(6):
+        cy, cx = rng.integers(0, h), rng.integers(0, w)
+        r = rng.integers(4, 15)
+        mask |= ((yy - cy) ** 2 + (xx - cx) ** 2 < r * r).astype(np.uint8)
+    return mask
+
+
+def test_threshold_rows_skips_line_padding():
+    data = bytes([0, 200, 127, 9, 9,
+                  255, 128, 1, 9, 9])
+    mask = threshold_rows(data, 3, 2, 5)
+    assert mask.dtype == np.uint8
+    assert mask.tolist() == [[1, 0, 1], [0, 0, 1]]
+
+
+def test_padded_band_adds_empty_border():
+    mask = np.ones((2, 3), dtype=np.uint8)
+    band = padded_band(mask, 0, 4)
+    assert band.shape == (4, 5)
+    assert band.sum() == 6
+    assert band[0].sum() == band[-1].sum() == 0
+    assert band[:, 0].sum() == band[:, -1].sum() == 0
+
+
+@pytest.mark.parametrize('mask', [np.zeros((0, 0)), np.zeros((5, 7)), np.ones((1, 1))])
+def test_trace_mask_without_outlines(mask):
+    assert trace_mask(mask) == []
+
+
+def test_trace_mask_square():
+    mask = np.zeros((12, 10), dtype=np.uint8)
+    mask[3:9, 2:8] = 1
+    outline, = trace_mask(mask)
+    assert outline[0] == outline[-1]
+    xs = [p[0] for p in outline]
+    ys = [p[1] for p in outline]
+    # контур проходит посередине между центрами пикселей
+    assert (min(xs), max(xs)) == (1.5, 7.5)
+    assert (min(ys), max(ys)) == (2.5, 8.5)
+
+
+def test_trace_mask_closes_outlines_at_image_border():
+    outline, = trace_mask(np.ones((6, 6), dtype=np.uint8))
+    xs = [p[0] for p in outline]
+    assert (min(xs), max(xs)) == (-0.5, 5.5)
+
+
+def test_every_point_has_one_successor():
+    mask = blobs()
+    starts, ends = trace_band(padded_band(mask, 0, mask.shape[0] + 2), 0)
+    start_set = set(map(tuple, starts.tolist()))
+    assert len(start_set) == len(starts)
+    assert start_set == set(map(tuple, ends.tolist()))
+    contours = join_segments(starts, ends)
+    assert sum(len(c) for c in contours) == len(starts)
+
+
+def test_holes_wind_opposite_to_outer_outline():
+    mask = np.zeros((20, 20), dtype=np.uint8)
+    mask[2:18, 2:18] = 1
+    mask[7:13, 7:13] = 0
+    outlines = trace_mask(mask, min_points=4)
+    assert len(outlines) == 2
+    areas = sorted(signed_area(o[:-1]) for o in outlines)
+    assert areas[0] * areas[1] < 0
+
+
+@pytest.mark.parametrize('band_height', [1, 2, 7, 64])
+def test_bands_do_not_change_outlines(band_height):
+    mask = blobs()
+    assert trace_mask(mask, band_height=band_height) == trace_mask(mask, band_height=1000)
+
+
+def test_simplify_drops_collinear_points():
+    line = [(x, 2 * x) for x in range(10)]
+    assert simplify(line, 0.5).tolist() == [[0, 0], [9, 18]]
+
+
+def test_simplify_keeps_points_beyond_epsilon():
+    pts = [(0, 0), (1, 0.2), (2, 3), (3, 0.1), (4, 0)]
+    assert simplify(pts, 1.0).tolist() == [[0, 0], [2, 3], [4, 0]]
+    assert len(simplify(pts, 0.05)) == 5
+
+
+def test_simplify_closed_does_not_repeat_start():
+    square = [(0, 0), (1, 0), (2, 0), (2, 1), (2, 2), (1, 2), (0, 2), (0, 1)]
+    result = simplify_closed(square, 0.1).tolist()
+    assert sorted(map(tuple, result)) == [(0, 0), (0, 2), (2, 0), (2, 2)]